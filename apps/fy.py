@@ -7,7 +7,6 @@
 #
 ####################################################################
 
-import re
 from urllib.parse import quote, urlencode
 
 import dash
@@ -17,26 +16,33 @@ import dash_bootstrap_components as dbc
 from dash import dcc
 from dash import html
 import pandas as pd
-import plotly.express as px  # (version 4.7.0)
-import plotly.graph_objects as go
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State, ClientsideFunction
 from dash.exceptions import PreventUpdate
 from dash_extensions import Download
 
 from app import app
 from datahandle.checkdata import input_check
 from datahandle.exfor_fy import read_exfy_a, read_exfy_za
+from datahandle.figs import (
+    new_figure,
+    no_data_figure,
+    check_figure,
+    fy_layout,
+    lib_traces,
+    exfor_traces,
+    label_einc,
+)
 from datahandle.genlinks import list_libfiles, list_exfiles, genzip
 from datahandle.index_fy import energy_range, read_index_fy
-from datahandle.library_fy import read_libfy
+from datahandle.library_fy import read_libfy, za_slice
 from datahandle.list import (
     ENERGIES,
     YIELD_TYPE,
     PARTICLE_FY,
     MT_LIST_FY,
-    color_libs,
     limit_by_datapoints,
 )
+from datahandle.store import encode_frame, decode_frame, frame_source, stored_frame
 from datahandle.tabs import create_tabs_fy
 from urlparser import parse_state, apply_default_value
 
@@ -261,12 +267,16 @@ layout = (
             ),
             # Hiddnen
             html.Div(id="stored_input_fy", style={"display": "none"}),
-            html.Div(id="stored_lib_za", style={"display": "none"}),
-            html.Div(id="stored_lib_a", style={"display": "none"}),
-            html.Div(id="stored_index_a", style={"display": "none"}),
-            html.Div(id="stored_index_za", style={"display": "none"}),
-            html.Div(id="stored_ex_a", style={"display": "none"}),
-            html.Div(id="stored_ex_za", style={"display": "none"}),
+            dcc.Store(id="stored_lib_za"),
+            dcc.Store(id="stored_lib_a"),
+            dcc.Store(id="stored_ex_a"),
+            dcc.Store(id="stored_ex_za"),
+            dcc.Store(id="stored_fig_a"),
+            dcc.Store(id="stored_fig_za"),
+            dcc.Store(id="exps_request_a"),
+            dcc.Store(id="exps_request_za"),
+            dcc.Store(id="exps_delta_a"),
+            dcc.Store(id="exps_delta_za"),
             # html.Div(id='stored_libfiles_a', style={'display': 'none'}),
             html.Div(id="stored_libfiles_za", style={"display": "none"}),
             html.Div(id="stored_exfiles_a", style={"display": "none"}),
@@ -310,12 +320,10 @@ def update_url_state(*values):
         Output("index_table_a", "data"),
         Output("index_table_za", "selected_rows"),
         Output("index_table_za", "data"),
-        Output("stored_lib_za", "children"),
-        Output("stored_lib_a", "children"),
+        Output("stored_lib_za", "data"),
+        Output("stored_lib_a", "data"),
         #  Output('stored_libfiles_a'   , 'children'),
         Output("stored_libfiles_za", "children"),
-        Output("stored_index_a", "children"),
-        Output("stored_index_za", "children"),
     ],
     [
         Input("fissile_elem", "value"),
@@ -343,9 +351,7 @@ def load_index(fissile_elem, fissile_mass, inc_pt4, inc_energy, fy_type):
         userinput = "".join([nuclide, "-", inc_pt4, "-", mt])
 
         # Read Library data
-        libfilesza, lib_a_df, lib_za_df = read_libfy(
-            nuclide, inc_pt4, mt, inc_energy, fy_type
-        )
+        libfilesza, lib_a_df, lib_za_df = read_libfy(nuclide, inc_pt4, mt, inc_energy)
 
         # Read EXFOR data
         index_a_df, index_za_df = read_index_fy(
@@ -391,11 +397,9 @@ def load_index(fissile_elem, fissile_mass, inc_pt4, inc_energy, fy_type):
         index_a_df.to_dict("records"),
         default_sel_za,
         index_za_df.to_dict("records"),
-        lib_za_df.to_json(),
-        lib_a_df.to_json(),
+        encode_frame(lib_za_df, ["fy.libza", [nuclide, inc_pt4, mt, inc_energy]]),
+        encode_frame(lib_a_df, ["fy.libya", [nuclide, inc_pt4, mt, inc_energy]]),
         libfilesza,
-        index_a_df.to_json(),
-        index_za_df.to_json(),
     )
 
 
@@ -403,73 +407,105 @@ def load_index(fissile_elem, fissile_mass, inc_pt4, inc_energy, fy_type):
 #  Read Y(A)
 #
 #
-@app.callback(
-    [Output("stored_exfiles_a", "children"), Output("stored_ex_a", "children")],
+app.clientside_callback(
+    ClientsideFunction(namespace="exps", function_name="select_fy"),
+    [
+        Output("stored_ex_a", "data"),
+        Output("exps_request_a", "data"),
+        Output("stored_exfiles_a", "children"),
+    ],
     [
         Input("stored_input_fy", "children"),
-        Input("stored_index_a", "children"),
         Input("index_table_a", "selected_rows"),
+        Input("exps_delta_a", "data"),
     ],
+    [State("index_table_a", "data"), State("stored_ex_a", "data")],
 )
-def build_expdf(userinput, stored_index_a, slctd_rows):
-    if userinput:
-        nuclide, inc_pt4, mt = userinput.split("-")
-    else:
-        raise PreventUpdate
-    try:
-        index_a_dff = pd.read_json(stored_index_a)
-    except:
-        raise PreventUpdate
 
-    if not index_a_dff.empty:
-        ee = index_a_dff["entry"].iloc[slctd_rows].to_list()
-        nn = index_a_dff["einc"].iloc[slctd_rows].to_list()
-        # ee = [index_a_dff[x].values.tolist() for x in ['entry', 'einc']]
+
+@app.callback(
+    Output("exps_delta_a", "data"),
+    [Input("exps_request_a", "data")],
+)
+def build_expdf(request):
+    # only (entry, einc) newly selected in index_table_a are requested,
+    # deselected ones are dropped in the browser (assets/clientside.js)
+    if request:
+        nuclide, inc_pt4, mt = request["input"].split("-")
     else:
-        ee = []
-        nn = []
+        raise PreventUpdate
 
-    # Read exfor data
-    # exfiles, exfor_df = read_exfy(nuclide, reaction, mt, inc_energy)
-    exfilesa, exya_df = read_exfy_a(nuclide, inc_pt4, mt, ee, nn)
+    entries = {}
+    for key, (e, n) in request["entries"].items():
+        exfilesa, exya_df = read_exfy_a(nuclide, inc_pt4, mt, [e], [n])
+        entries[key] = {
+            "files": exfilesa,
+            "data": encode_frame(exya_df, ["fy.exya", [nuclide, inc_pt4, mt, e, n]]),
+        }
 
-    return exfilesa, exya_df.to_json(double_precision=12)
+    return {"input": request["input"], "entries": entries}
 
 
 # ------------------------------------------------------------------------------
 #  Read Y(Z,A)
 #
 #
-@app.callback(
-    [Output("stored_exfiles_za", "children"), Output("stored_ex_za", "children")],
+app.clientside_callback(
+    ClientsideFunction(namespace="exps", function_name="select_fy"),
+    [
+        Output("stored_ex_za", "data"),
+        Output("exps_request_za", "data"),
+        Output("stored_exfiles_za", "children"),
+    ],
     [
         Input("stored_input_fy", "children"),
-        Input("stored_index_za", "children"),
         Input("index_table_za", "selected_rows"),
+        Input("exps_delta_za", "data"),
     ],
+    [State("index_table_za", "data"), State("stored_ex_za", "data")],
+)
+
+
+@app.callback(
+    Output("exps_delta_za", "data"),
+    [Input("exps_request_za", "data")],
 )
-def build_exza(userinput, stored_index_za, slctd_rows_za):
-    if userinput:
-        nuclide, inc_pt4, mt = userinput.split("-")
+def build_exza(request):
+    if request:
+        nuclide, inc_pt4, mt = request["input"].split("-")
     else:
         raise PreventUpdate
-    try:
-        index_za_dff = pd.read_json(stored_index_za)
-    except:
-        raise PreventUpdate
 
-    if not index_za_dff.empty:
-        # print(index_za_dff)
-        ee2 = index_za_dff["entry"].iloc[slctd_rows_za].to_list()
-        nn2 = index_za_dff["einc"].iloc[slctd_rows_za].to_list()
-        # ee = [index_a_dff[x].values.tolist() for x in ['entry', 'einc']]
-    else:
-        ee2 = []
-        nn2 = []
+    entries = {}
+    for key, (e, n) in request["entries"].items():
+        exfilesza, exza_df = read_exfy_za(nuclide, inc_pt4, mt, [e], [n])
+        entries[key] = {
+            "files": exfilesza,
+            "data": encode_frame(exza_df, ["fy.exza", [nuclide, inc_pt4, mt, e, n]]),
+        }
+
+    return {"input": request["input"], "entries": entries}
 
-    exfilesza, exza_df = read_exfy_za(nuclide, inc_pt4, mt, ee2, nn2)
 
-    return exfilesza, exza_df.to_json(double_precision=12)
+# frames of the server side store read again when expired, see datahandle/store.py
+@frame_source("fy.libya")
+def libya_frame(nuclide, inc_pt, mt, energy):
+    return read_libfy(nuclide, inc_pt, mt, energy)[1]
+
+
+@frame_source("fy.libza")
+def libza_frame(nuclide, inc_pt, mt, energy):
+    return read_libfy(nuclide, inc_pt, mt, energy)[2]
+
+
+@frame_source("fy.exya")
+def exya_frame(nuclide, inc_pt, mt, e, n):
+    return read_exfy_a(nuclide, inc_pt, mt, [e], [n])[1]
+
+
+@frame_source("fy.exza")
+def exza_frame(nuclide, inc_pt, mt, e, n):
+    return read_exfy_za(nuclide, inc_pt, mt, [e], [n])[1]
 
 
 # ------------------------------------------------------------------------------
@@ -477,106 +513,68 @@ def build_exza(userinput, stored_index_za, slctd_rows_za):
 #
 #
 @app.callback(
+    Output("stored_fig_a", "data"),
     [
-        Output("main_graph_a", "figure"),
-        Output("exfor_table_a", "data"),
-        Output("file_list_a", "children"),
-    ],
-    [
-        Input("stored_ex_a", "children"),
-        Input("stored_lib_a", "children"),
-        Input("tabs-a", "active_tab"),
-        Input("yaxis_ya", "value"),
-        #  Input('stored_libfiles_a'    , 'children'),
-        Input("stored_exfiles_a", "children"),
+        Input("stored_ex_a", "data"),
+        Input("stored_lib_a", "data"),
     ],
+    [State("yaxis_ya", "value")],
 )
-def update_ya_graph(stored_ex_a, stored_lib_a, slctd_tab, yaxis_ya, exfiles):
-
-    fig = go.Figure(
-        layout=go.Layout(
-            xaxis={"title": "Mass number", "type": "linear", "dtick": 10},
-            yaxis={
-                "title": "Fission yields [/fission]",
-                "type": "linear" if yaxis_ya == "Linear" else "log",
-                "exponentformat": "power",
-            },
-            margin={"l": 40, "b": 40, "t": 30, "r": 0},
-        )
-    )
+def update_ya_graph(stored_ex_a, stored_lib_a, yaxis_ya):
+
+    fig = new_figure(fy_layout("Mass number", 10, yaxis_ya))
+
+    if not stored_lib_a or not stored_ex_a:
+        raise PreventUpdate
 
     try:
         # Re-constract library dataframe and add trace to fig
-        libya_dff = pd.read_json(stored_lib_a)
+        libya_dff = decode_frame(stored_lib_a)
 
         # Re-constract EXFOR dataframe and add trace to fig
-        exya_dff = pd.read_json(stored_ex_a)
+        exya_dff = stored_frame(stored_ex_a)
 
-    except:
+    except KeyError:
         raise PreventUpdate
 
     if not libya_dff.empty:
-        ll = libya_dff["lib"].unique()
-        for l in ll:
-            line_color = color_libs(l)
-            new_col = next(line_color)
-            fig.add_trace(
-                go.Scatter(
-                    x=libya_dff[libya_dff["lib"] == l]["A"],
-                    y=libya_dff[libya_dff["lib"] == l]["FPY"],
-                    showlegend=True,
-                    line_color=new_col,
-                    name=l,
-                    mode="lines",
-                )
-            )
+        fig["data"] += lib_traces(libya_dff, "A", "FPY")
 
     if not exya_dff.empty:
-        ee = exya_dff["entry"].unique()
-        i = 0
-
-        for e in ee:
-            nn = exya_dff[exya_dff["entry"] == e]["Einc"].unique()
-
-            for n in nn:
-                label = str(
-                    exya_dff[exya_dff["entry"] == e]["author"].unique()
-                    + ","
-                    + "{:.2e}".format(n)
-                )
-                label = re.sub("\[|\]|'", "", label)
-
-                fig.add_trace(
-                    go.Scatter(
-                        x=exya_dff[(exya_dff["entry"] == e) & (exya_dff["Einc"] == n)][
-                            "A"
-                        ],
-                        y=exya_dff[(exya_dff["entry"] == e) & (exya_dff["Einc"] == n)][
-                            "FPY"
-                        ],
-                        error_y=dict(
-                            type="data",
-                            array=exya_dff[
-                                (exya_dff["entry"] == e) & (exya_dff["Einc"] == n)
-                            ]["dFPY"],
-                        ),
-                        showlegend=True,
-                        name=label,
-                        marker=dict(size=8, symbol=i),
-                        mode="markers",
-                    )
-                )
-                i += 1
+        fig["data"] += exfor_traces(
+            exya_dff, ["entry", "Einc"], "A", "FPY", label_einc, dy="dFPY"
+        )
 
     if libya_dff.empty and exya_dff.empty:
-        fig = px.scatter(title="No data found")
-        fig.update_layout(title_font_color="orange")
+        fig = no_data_figure()
+
+    return check_figure(fig)
 
+
+# Data table and download links of the selected tab
+@app.callback(
+    [Output("exfor_table_a", "data"), Output("file_list_a", "children")],
+    [
+        Input("tabs-a", "active_tab"),
+        Input("stored_ex_a", "data"),
+        #  Input('stored_libfiles_a'    , 'children'),
+        Input("stored_exfiles_a", "children"),
+    ],
+)
+def update_tabs_a(slctd_tab, stored_ex_a, exfiles):
     if slctd_tab == "ds-a":
-        return fig, dash.no_update, dash.no_update
+        return dash.no_update, dash.no_update
+
+    if not stored_ex_a:
+        raise PreventUpdate
+
+    try:
+        exya_dff = stored_frame(stored_ex_a)
+    except KeyError:
+        raise PreventUpdate
 
     if slctd_tab == "datatable-a":
-        return fig, exya_dff.to_dict("records"), dash.no_update
+        return exya_dff.to_dict("records"), dash.no_update
 
     elif slctd_tab == "dl-a":
         exya_dff = exya_dff[
@@ -611,7 +609,15 @@ def update_ya_graph(stored_ex_a, stored_lib_a, slctd_tab, yaxis_ya, exfiles):
                 # html.Div(children=libflinks),
             ]
         )
-        return fig, dash.no_update, downloadcorrections
+        return dash.no_update, downloadcorrections
+
+
+# Linear/Log switch without the server, see assets/clientside.js
+app.clientside_callback(
+    ClientsideFunction(namespace="figs", function_name="yaxis"),
+    Output("main_graph_a", "figure"),
+    [Input("stored_fig_a", "data"), Input("yaxis_ya", "value")],
+)
 
 
 @app.callback(
@@ -637,113 +643,72 @@ def func(n_clicks, exfiles, slctd_tab):
 #
 #
 @app.callback(
+    Output("stored_fig_za", "data"),
     [
-        Output("sub_graph_za", "figure"),
-        Output("exfor_table_za", "data"),
-        Output("file_list_za", "children"),
-    ],
-    [
-        Input("stored_lib_za", "children"),
-        Input("stored_ex_za", "children"),
+        Input("stored_lib_za", "data"),
+        Input("stored_ex_za", "data"),
         Input("fpmass", "value"),
-        Input("tabs-za", "active_tab"),
-        Input("yaxis_za", "value"),
-        Input("stored_libfiles_za", "children"),
-        Input("stored_exfiles_za", "children"),
     ],
+    [State("yaxis_za", "value")],
 )
-def update_yza_graph(
-    stored_lib_za, stored_ex_za, fpmass, slctd_tab, yaxis_za, libfiles, exfiles
-):
-    fig2 = go.Figure(
-        layout=go.Layout(
-            xaxis={
-                "title": "Charge number",
-                "type": "linear",
-                "dtick": 1,
-            },
-            yaxis={
-                "title": "Fission yields [/fission]",
-                "type": "log" if yaxis_za == "Log" else "linear",
-                "exponentformat": "power",
-            },
-            margin={"l": 40, "b": 40, "t": 30, "r": 0},
-        )
-    )
+def update_yza_graph(stored_lib_za, stored_ex_za, fpmass, yaxis_za):
+    fig2 = new_figure(fy_layout("Charge number", 1, yaxis_za))
+
+    if not stored_lib_za or not stored_ex_za:
+        raise PreventUpdate
 
     try:
         # Re-constract library/experiment dataframe to add trace to fig
-        libfy_dff = pd.read_json(stored_lib_za)
-        exfy_dff = pd.read_json(stored_ex_za)
+        libfy_dff = decode_frame(stored_lib_za)
+        exfy_dff = stored_frame(stored_ex_za)
 
-    except:
+    except KeyError:
         raise PreventUpdate
 
     if not libfy_dff.empty:
-        libfy_dff = libfy_dff[libfy_dff["A"] == fpmass]
-        ll = libfy_dff["lib"].unique()
-        for l in ll:
-            # new_col = next(line_color)
-            line_color = color_libs(l)
-            new_col = next(line_color)
-            fig2.add_trace(
-                go.Scatter(
-                    x=libfy_dff[(libfy_dff["lib"] == l) & (libfy_dff["M"] == 0)]["Z"],
-                    y=libfy_dff[(libfy_dff["lib"] == l) & (libfy_dff["M"] == 0)]["FPY"],
-                    error_y=dict(
-                        type="data",
-                        array=libfy_dff[
-                            (libfy_dff["lib"] == l) & (libfy_dff["M"] == 0)
-                        ]["dFPY"],
-                    ),
-                    showlegend=True,
-                    line_color=new_col,
-                    name=l,
-                    mode="lines",
-                )
-            )
+        libfy_dff = za_slice(libfy_dff, fpmass)
+        fig2["data"] += lib_traces(libfy_dff, "Z", "FPY", dy="dFPY")
 
     if not exfy_dff.empty:
         exfy_dff = exfy_dff[exfy_dff["A"] == fpmass]
-        ee = exfy_dff["entry"].unique()
-
-        i = 0
-
-        for e in ee:
-            nn = exfy_dff[exfy_dff["entry"] == e]["Einc"].unique()
-
-            for n in nn:
-                label = str(
-                    exfy_dff[exfy_dff["entry"] == e]["author"].unique()
-                    + ","
-                    + "{:.2e}".format(n)
-                )
-                label = re.sub("\[|\]|'", "", label)
-
-                fig2.add_trace(
-                    go.Scatter(
-                        x=exfy_dff[exfy_dff["entry"] == e]["Z"],
-                        y=exfy_dff[exfy_dff["entry"] == e]["FPY"],
-                        error_y=dict(
-                            type="data", array=exfy_dff[exfy_dff["entry"] == e]["dFPY"]
-                        ),
-                        showlegend=True,
-                        name=label,
-                        marker=dict(size=8, symbol=i),
-                        mode="markers",
-                    )
-                )
-                i += 1
+        fig2["data"] += exfor_traces(
+            exfy_dff, ["entry", "Einc"], "Z", "FPY", label_einc, dy="dFPY"
+        )
 
     if libfy_dff.empty and exfy_dff.empty:
-        fig2 = px.scatter(title="No data found")
-        fig2.update_layout(title_font_color="orange")
+        fig2 = no_data_figure()
+
+    return check_figure(fig2)
 
+
+# Data table and download links of the selected tab
+@app.callback(
+    [Output("exfor_table_za", "data"), Output("file_list_za", "children")],
+    [
+        Input("tabs-za", "active_tab"),
+        Input("stored_ex_za", "data"),
+        Input("fpmass", "value"),
+        Input("stored_libfiles_za", "children"),
+        Input("stored_exfiles_za", "children"),
+    ],
+)
+def update_tabs_za(slctd_tab, stored_ex_za, fpmass, libfiles, exfiles):
     if slctd_tab == "ds-za":
-        return fig2, dash.no_update, dash.no_update
+        return dash.no_update, dash.no_update
+
+    if not stored_ex_za:
+        raise PreventUpdate
+
+    try:
+        exfy_dff = stored_frame(stored_ex_za)
+    except KeyError:
+        raise PreventUpdate
+
+    if not exfy_dff.empty:
+        exfy_dff = exfy_dff[exfy_dff["A"] == fpmass]
 
     if slctd_tab == "datatable-za":
-        return fig2, exfy_dff.to_dict("records"), dash.no_update
+        return exfy_dff.to_dict("records"), dash.no_update
 
     elif slctd_tab == "dl-za":
         exfy_dff = exfy_dff[
@@ -781,7 +746,15 @@ def update_yza_graph(
                 html.Div(children=libflinks),
             ]
         )
-        return fig2, dash.no_update, downloadcorrections
+        return dash.no_update, downloadcorrections
+
+
+# Linear/Log switch without the server, see assets/clientside.js
+app.clientside_callback(
+    ClientsideFunction(namespace="figs", function_name="yaxis"),
+    Output("sub_graph_za", "figure"),
+    [Input("stored_fig_za", "data"), Input("yaxis_za", "value")],
+)
 
 
 @app.callback(
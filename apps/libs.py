@@ -7,21 +7,27 @@
 #
 ####################################################################
 
-import pandas as pd
-import plotly.express as px  # (version 4.7.0)
-import plotly.graph_objects as go
-
 # from plotly.validators.scatter.marker import SymbolValidator
 
 from dash import html
 from dash import dcc
 import dash_bootstrap_components as dbc
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State, ClientsideFunction
 from dash.exceptions import PreventUpdate
+from itertools import islice
 from urllib.parse import urlencode
 
 from datahandle.list import LIB_LIST_MAX, read_mt, color_libs
+from datahandle.figs import (
+    new_figure,
+    no_data_figure,
+    check_figure,
+    chart_layout,
+    group_slices,
+)
+from datahandle.downsample import decimate_frame
 from datahandle.library_cs import read_libs_lib
+from datahandle.store import encode_frame, decode_frame, frame_source
 from datahandle.checkdata import input_check
 from urlparser import parse_state, apply_default_value_lib
 from datahandle.genlinks import list_libfiles
@@ -227,7 +233,9 @@ layout = (
                     )
                 ],
             ),
-            html.Div(id="stored_libs_lib", style={"display": "none"}),
+            dcc.Store(id="stored_libs_lib"),
+            dcc.Store(id="stored_fig_lib"),
+            dcc.Store(id="zoom_lib"),
             html.Div(id="stored_libfiles_lib", style={"display": "none"}),
         ],
         fluid=True,
@@ -267,7 +275,7 @@ def update_url_state(*values):
 @app.callback(
     [
         Output("output_container_lib", "children"),
-        Output("stored_libs_lib", "children"),
+        Output("stored_libs_lib", "data"),
         Output("stored_libfiles_lib", "children"),
     ],
     [
@@ -307,7 +315,18 @@ def builddf2(target_elem2, target_mass2, reaction2, libs, groupwise):
 
     container = "{}".format(selected)
 
-    return container, lib_df2.to_json(double_precision=13), libfiles
+    return (
+        container,
+        encode_frame(lib_df2, ["libs.libs", [nuclide, reaction2, libs, groupwise]]),
+        libfiles,
+    )
+
+
+# frame of the server side store read again when expired, see datahandle/store.py
+@frame_source("libs.libs")
+def libs_frame(nuclide, reaction2, libs, groupwise):
+    slct_mt_df = mt_df[mt_df.Reaction.isin(reaction2)]
+    return read_libs_lib(nuclide, slct_mt_df, libs, groupwise)[1]
 
 
 # ------------------------------------------------------------------------------
@@ -315,120 +334,100 @@ def builddf2(target_elem2, target_mass2, reaction2, libs, groupwise):
 #
 #
 @app.callback(
-    [Output("main_graph_lib", "figure"), Output("file_list_lib", "children")],
+    [Output("stored_fig_lib", "data"), Output("file_list_lib", "children")],
     [
-        Input("stored_libs_lib", "children"),
+        Input("stored_libs_lib", "data"),
         Input("stored_libfiles_lib", "children"),
-        Input("xaxis_type2", "value"),
-        Input("yaxis_type2", "value"),
+        Input("zoom_lib", "data"),
+    ],
+    [
+        State("xaxis_type2", "value"),
+        State("yaxis_type2", "value"),
+        State("output_container_lib", "children"),
+        State("libs", "value"),
+        State("groupwise_lib", "value"),
     ],
 )
-def update_graph_lib(stored_libs_lib, libfiles, xaxis_type2, yaxis_type2):
-    # Fig definition
-    fig = go.Figure(
-        layout=go.Layout(
-            # template="plotly_white",
-            xaxis={
-                "title": "Incident energy [eV]",
-                "type": "log" if xaxis_type2 == "Log" else "linear",
-                "rangeslider": {
-                    "bgcolor": "White",
-                    "autorange": True,
-                    "thickness": 0.15,
-                },
-            },
-            yaxis={
-                "title": "Cross section [barn]",
-                "type": "log" if yaxis_type2 == "Log" else "linear",
-                "fixedrange": False,
-            },
-            margin={"l": 40, "b": 40, "t": 30, "r": 0},
-        )
+def update_graph_lib(
+    stored_libs_lib, libfiles, zoom, xaxis_type2, yaxis_type2, selected, libs, groupwise
+):
+    # Fig definition, the zoom is kept until new data is selected
+    fig = new_figure(chart_layout("wide", xaxis_type2, yaxis_type2))
+    fig["layout"]["uirevision"] = "-".join(
+        [str(selected), ",".join(libs or []), "".join(groupwise or [])]
     )
 
-    # Expornential format
-    fig.update_xaxes(exponentformat="power")
-    fig.update_yaxes(exponentformat="power")
+    if not stored_libs_lib:
+        raise PreventUpdate
 
     # Re-constract library dataframe and add trace to fig
     try:
-        lib_dff2 = pd.read_json(stored_libs_lib)
-    except:
+        lib_dff2 = decode_frame(stored_libs_lib)
+    except KeyError:
         raise PreventUpdate
 
     # Color difinitions
     # line_color = color_cycle()
 
     if lib_dff2.empty:
-        fig = px.scatter(title="No data found")
-        fig.update_layout(title_font_color="orange")
+        fig = no_data_figure()
 
     else:
-        mm = lib_dff2["MT"].unique()
-        ll = lib_dff2["lib"].unique()
-        iso = lib_dff2["isomeric"].unique()
-        plot_df = pd.DataFrame()
-
-        for l in ll:
-            # new_col = next(line_color)
-            line_color = color_libs(l)
-            for m in mm:
-                mt = str(m).zfill(3)
-                new_col = next(line_color)
-                for i in iso:
-                    plot_df = lib_dff2[
-                        (lib_dff2["lib"] == l)
-                        & (lib_dff2["MT"] == m)
-                        & (lib_dff2["isomeric"] == i)
-                    ]
-                    labeln = l + "-MT:" + mt + i
-
-                    if i == "":
-                        ls = "solid"
-                    elif i == "g":
-                        ls = "dot"
-                    elif i == "m":
-                        ls = "dash"
-
-                    x = plot_df["Energy"]
-                    y = plot_df["XS"]
-                    y_upper = plot_df["xsupp"]
-                    y_lower = plot_df["xslow"]
-
-                    trace_upper = go.Scatter(
-                        x=x,  # x, then x reversed
-                        y=y_upper,  # upper, then lower reversed
-                        line=dict(width=0),
-                        fillcolor="rgba(191, 191, 191, 0.5)",
-                        hoverinfo="skip",
-                        showlegend=False,
-                        mode="lines",
-                    )
-                    trace_mean = go.Scatter(
-                        x=x,
-                        y=y,
-                        showlegend=True,
-                        name=labeln,
-                        mode="lines",
-                        line_color=new_col,
-                        # line=dict(color='rgb(31, 119, 180)'),
-                        fillcolor="rgba(191, 191, 191, 0.5)",
-                        line_dash=ls,
-                        fill="tonexty",
-                    )
-                    trace_lower = go.Scatter(
-                        x=x,  # x, then x reversed
-                        y=y_lower,  # upper, then lower reversed
-                        line=dict(width=0),
-                        fillcolor="rgba(191, 191, 191, 0.5)",
-                        fill="tonexty",
-                        hoverinfo="skip",
-                        showlegend=False,
-                        mode="lines",
-                    )
-                    fig.add_trace(trace_upper)
-                    fig.add_trace(trace_mean)
-                    fig.add_trace(trace_lower)
+        # colors of a library are given in order of MT
+        mm = list(lib_dff2["MT"].unique())
+
+        for (l, m, i), plot_df in group_slices(lib_dff2, ["lib", "MT", "isomeric"]):
+            mt = str(m).zfill(3)
+            new_col = next(islice(color_libs(l), mm.index(m), None))
+            labeln = l + "-MT:" + mt + i
+
+            if i == "":
+                ls = "solid"
+            elif i == "g":
+                ls = "dot"
+            elif i == "m":
+                ls = "dash"
+
+            plot_df = decimate_frame(plot_df, "Energy", "XS", zoom)
+            x = plot_df["Energy"].to_numpy()
+            y = plot_df["XS"].to_numpy()
+            y_upper = plot_df["xsupp"].to_numpy()
+            y_lower = plot_df["xslow"].to_numpy()
+
+            trace_upper = {
+                "type": "scatter",
+                "x": x,  # x, then x reversed
+                "y": y_upper,  # upper, then lower reversed
+                "line": {"width": 0},
+                "fillcolor": "rgba(191, 191, 191, 0.5)",
+                "hoverinfo": "skip",
+                "showlegend": False,
+                "mode": "lines",
+            }
+            trace_mean = {
+                "type": "scatter",
+                "x": x,
+                "y": y,
+                "showlegend": True,
+                "name": labeln,
+                "mode": "lines",
+                "line": {"color": new_col, "dash": ls},
+                # line=dict(color='rgb(31, 119, 180)'),
+                "fillcolor": "rgba(191, 191, 191, 0.5)",
+                "fill": "tonexty",
+            }
+            trace_lower = {
+                "type": "scatter",
+                "x": x,  # x, then x reversed
+                "y": y_lower,  # upper, then lower reversed
+                "line": {"width": 0},
+                "fillcolor": "rgba(191, 191, 191, 0.5)",
+                "fill": "tonexty",
+                "hoverinfo": "skip",
+                "showlegend": False,
+                "mode": "lines",
+            }
+            fig["data"] += [trace_upper, trace_mean, trace_lower]
 
     # for download
     libflinks = list_libfiles(libfiles)
@@ -440,7 +439,33 @@ def update_graph_lib(stored_libs_lib, libfiles, xaxis_type2, yaxis_type2):
         ]
     )
 
-    return fig, downloadcorrections
+    return check_figure(fig), downloadcorrections
+
+
+# Linear/Log switch without the server, see assets/clientside.js
+app.clientside_callback(
+    ClientsideFunction(namespace="figs", function_name="axes"),
+    Output("main_graph_lib", "figure"),
+    [
+        Input("stored_fig_lib", "data"),
+        Input("xaxis_type2", "value"),
+        Input("yaxis_type2", "value"),
+    ],
+)
+
+
+# energy window of zoom or range slider, see assets/clientside.js
+app.clientside_callback(
+    ClientsideFunction(namespace="zoom", function_name="window"),
+    Output("zoom_lib", "data"),
+    [
+        Input("main_graph_lib", "relayoutData"),
+        Input("xaxis_type2", "value"),
+        Input("yaxis_type2", "value"),
+        Input("stored_libs_lib", "data"),
+    ],
+    [State("zoom_lib", "data")],
+)
 
 
 # # ------------------------------------------------------------------------------
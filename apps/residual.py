@@ -8,8 +8,6 @@
 ####################################################################
 
 import pandas as pd
-import plotly.express as px  # (version 4.7.0)
-import plotly.graph_objects as go
 
 # from plotly.validators.scatter.marker import SymbolValidator
 
@@ -17,22 +15,39 @@ import dash
 from dash import dcc
 from dash import html
 import dash_bootstrap_components as dbc
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State, ClientsideFunction
 from dash.exceptions import PreventUpdate
 from dash_extensions import Download
 
 from urllib.parse import quote, urlencode
-import re
 
-from datahandle.list import PARTICLE, read_mt, color_libs, limit_by_datapoints
+from datahandle.list import PARTICLE, read_mt, limit_by_datapoints
 from datahandle.index_cs import read_index_rp
 from datahandle.exfor_cs import read_resid_prod_exfor
 from datahandle.library_cs import read_resid_prod_lib
-from datahandle.list_rp import list_resid_prod
+from datahandle.list_rp import (
+    list_resid_prod,
+    resid_prod_options,
+    find_producers,
+)
 from datahandle.checkdata import input_check
-from datahandle.figs import default_chart
-from datahandle.tabs import create_tabs
+from datahandle.figs import (
+    default_chart,
+    no_data_figure,
+    check_figure,
+    lib_traces,
+    exfor_traces,
+    label_year,
+)
+from datahandle.tabs import create_tabs, create_producers_table
 from datahandle.genlinks import list_libfiles, list_exfiles, genzip
+from datahandle.store import (
+    encode_frame,
+    decode_frame,
+    frame_source,
+    split_entries,
+    stored_frame,
+)
 from urlparser import parse_state, apply_default_value
 from app import app
 
@@ -52,7 +67,7 @@ tooltip = html.Div(
         html.P(
             [
                 html.Span(
-                    "Residual products in TENDL-2021",
+                    "Residual products",
                     id="tooltip-target",
                     style={
                         "textDecoration": "underline",
@@ -187,6 +202,19 @@ def layout_inputs(params):
                         # dbc.Col(html.Dd('e.g. 56, 99g (ground), 99m(metastable)')),
                     ]
                 ),
+                dbc.Row(
+                    [
+                        dbc.Col(html.Label("Residual product"), width=3),
+                        dbc.Col(
+                            dcc.Dropdown(
+                                id="rp_select",
+                                placeholder="Products with library or EXFOR data",
+                                multi=False,
+                            ),
+                            width=4,
+                        ),
+                    ]
+                ),
             ],
             className="h-25",
         ),
@@ -264,11 +292,16 @@ layout = (
             ),
             # Tables and download file list in Tabs
             tabs_inputs,
+            html.Br(),
+            # Other targets and projectiles producing the residual
+            create_producers_table("rp"),
             # Hidden table
             html.Div(id="stored_input_rp", style={"display": "none"}),
-            html.Div(id="stored_libs_rp", style={"display": "none"}),
-            html.Div(id="stored_exps_rp", style={"display": "none"}),
-            html.Div(id="stored_index_rp", style={"display": "none"}),
+            dcc.Store(id="stored_libs_rp"),
+            dcc.Store(id="stored_exps_rp"),
+            dcc.Store(id="stored_fig_rp"),
+            dcc.Store(id="exps_request_rp"),
+            dcc.Store(id="exps_delta_rp"),
             html.Div(id="stored_libfiles_rp", style={"display": "none"}),
             html.Div(id="stored_exfiles_rp", style={"display": "none"}),
         ],
@@ -301,12 +334,12 @@ def update_url_state(*values):
 
 
 # ------------------------------------------------------------------------------
-# Read selection of residual product from tendl.2019
+# Residual products of the target, see datahandle/list_rp.py
 #
 
 
 @app.callback(
-    Output("tooltip-origin", "children"),
+    [Output("tooltip-origin", "children"), Output("rp_select", "options")],
     [
         Input("target_elem3", "value"),
         Input("target_mass3", "value"),
@@ -319,11 +352,44 @@ def update_rpdropdown(target_elem3, target_mass3, inc_pt):
 
         rps = list_resid_prod(target, mass, inc_pt)
         rps = ", ".join([str(elem) for elem in rps])
+        options = resid_prod_options(target, mass, inc_pt)
 
     else:
         # raise PreventUpdate
         rps = []
-    return rps
+        options = []
+    return rps, options
+
+
+@app.callback(
+    [Output("rp_elem", "value"), Output("rp_mass", "value")],
+    [Input("rp_select", "value")],
+)
+def select_rp(rp_select):
+    if not rp_select:
+        raise PreventUpdate
+
+    rp_elem, rp_mass = rp_select.split("-")
+    return rp_elem, rp_mass
+
+
+# Targets and projectiles producing the residual
+@app.callback(
+    [Output("producers_title_rp", "children"), Output("producers_table_rp", "data")],
+    [Input("rp_elem", "value"), Input("rp_mass", "value")],
+)
+def update_producers(rp_elem, rp_mass):
+    if not (rp_elem and rp_mass):
+        raise PreventUpdate
+
+    rp_elem, rp_mass = input_check(rp_elem, rp_mass)
+    rows = find_producers(rp_elem, rp_mass)
+
+    title = "".join(
+        [rp_elem, "-", rp_mass, " is produced by ", str(len(rows)), " projectile-target pair(s)"]
+    )
+
+    return title, rows
 
 
 # ------------------------------------------------------------------------------
@@ -336,9 +402,9 @@ def update_rpdropdown(target_elem3, target_mass3, inc_pt):
         Output("stored_input_rp", "children"),
         Output("index_table_rp", "selected_rows"),
         Output("index_table_rp", "data"),
-        Output("stored_libs_rp", "children"),
+        Output("stored_libs_rp", "data"),
         Output("stored_libfiles_rp", "children"),
-        Output("stored_index_rp", "children"),
+        Output("stored_exfiles_rp", "children"),
     ],
     [
         Input("target_elem3", "value"),
@@ -364,6 +430,9 @@ def load_index_rp(target_elem3, target_mass3, inc_pt, rp_elem, rp_mass):
         # read EXFOR index file
         rpindex_df = read_index_rp(nuclide, inc_pt, rp_elem, rp_mass)
 
+        # EXFORTABLES files for download, data is read on selection
+        exrpfiles, _ = read_resid_prod_exfor(nuclide, inc_pt, rp_elem, rp_mass, [])
+
         if not rpindex_df.empty:
             default_sel = limit_by_datapoints(rpindex_df)
         else:
@@ -393,9 +462,9 @@ def load_index_rp(target_elem3, target_mass3, inc_pt, rp_elem, rp_mass):
         userinput,
         default_sel,
         rpindex_df.to_dict("records"),
-        rplib_df.to_json(double_precision=12),
+        encode_frame(rplib_df, ["residual.libs", [nuclide, inc_pt, rp_elem, rp_mass]]),
         rplibfiles,
-        rpindex_df.to_json(double_precision=12),
+        exrpfiles,
     )
 
 
@@ -403,66 +472,68 @@ def load_index_rp(target_elem3, target_mass3, inc_pt, rp_elem, rp_mass):
 # 2. read experimental data
 #
 #
-@app.callback(
-    [Output("stored_exfiles_rp", "children"), Output("stored_exps_rp", "children")],
+app.clientside_callback(
+    ClientsideFunction(namespace="exps", function_name="select"),
+    [Output("stored_exps_rp", "data"), Output("exps_request_rp", "data")],
     [
         Input("stored_input_rp", "children"),
-        Input("stored_index_rp", "children"),
         Input("index_table_rp", "selected_rows"),
+        Input("exps_delta_rp", "data"),
     ],
+    [State("index_table_rp", "data"), State("stored_exps_rp", "data")],
 )
-def build_expdf(userinput, stored_index_rp, slctd_rows):
-    if userinput:
-        nuclide, inc_pt, rp_elem, rp_mass = userinput.split("-")
-    else:
-        raise PreventUpdate
 
-    try:
-        index_dff_rp = pd.read_json(stored_index_rp)
-    except:
-        raise PreventUpdate
 
-    if not index_dff_rp.empty:
-        ee = index_dff_rp["entry"].iloc[slctd_rows]
-        ee = ee.astype(str).to_list()
+@app.callback(
+    Output("exps_delta_rp", "data"),
+    [Input("exps_request_rp", "data")],
+)
+def build_expdf(request):
+    # only datasets newly selected in index_table_rp are requested,
+    # deselected ones are dropped in the browser (assets/clientside.js)
+    if request:
+        nuclide, inc_pt, rp_elem, rp_mass = request["input"].split("-")
     else:
-        ee = []
+        raise PreventUpdate
+
+    ee = [str(e[0]) for e in request["entries"].values()]
 
     exrpfiles, rpex_df = read_resid_prod_exfor(nuclide, inc_pt, rp_elem, rp_mass, ee)
 
-    return exrpfiles, rpex_df.to_json(double_precision=12)
+    return {
+        "input": request["input"],
+        "entries": split_entries(
+            rpex_df,
+            request["entries"].keys(),
+            ["residual.exfor", [nuclide, inc_pt, rp_elem, rp_mass]],
+        ),
+    }
+
+
+# frames of the server side store read again when expired, see datahandle/store.py
+@frame_source("residual.libs")
+def libs_frame(nuclide, inc_pt, rp_elem, rp_mass):
+    return read_resid_prod_lib(nuclide, inc_pt, rp_elem, rp_mass)[1]
+
+
+@frame_source("residual.exfor")
+def exfor_frame(nuclide, inc_pt, rp_elem, rp_mass, entry):
+    return read_resid_prod_exfor(nuclide, inc_pt, rp_elem, rp_mass, [entry])[1]
 
 
 # ------------------------------------------------------------------------------
 # Main Figure Update
 #
 @app.callback(
-    [
-        Output("main_graph_rp", "figure"),
-        Output("exfor_table_rp", "data"),
-        Output("file_list_rp", "children"),
-    ],
+    Output("stored_fig_rp", "data"),
     [
         Input("stored_input_rp", "children"),
-        Input("tabs-rp", "active_tab"),
-        Input("stored_libs_rp", "children"),
-        Input("stored_exps_rp", "children"),
-        Input("xaxis_type3", "value"),
-        Input("yaxis_type3", "value"),
-        Input("stored_libfiles_rp", "children"),
-        Input("stored_exfiles_rp", "children"),
+        Input("stored_libs_rp", "data"),
+        Input("stored_exps_rp", "data"),
     ],
+    [State("xaxis_type3", "value"), State("yaxis_type3", "value")],
 )
-def update_figure_rp(
-    userinput,
-    slctd_tab_rp,
-    stored_libs_rp,
-    stored_exps_rp,
-    xaxis_type,
-    yaxis_type,
-    libfiles,
-    exfiles,
-):
+def update_figure_rp(userinput, stored_libs_rp, stored_exps_rp, xaxis_type, yaxis_type):
     if userinput:
         nuclide, inc_pt, rp_elem, rp_mass = userinput.split("-")
         reaction = "".join([inc_pt, ",x"])
@@ -470,80 +541,75 @@ def update_figure_rp(
     else:
         raise PreventUpdate
 
+    if not stored_libs_rp or not stored_exps_rp:
+        raise PreventUpdate
+
     try:
         # Re-constract library dataframe and add trace to fig
-        rplib_dff = pd.read_json(stored_libs_rp)
+        rplib_dff = decode_frame(stored_libs_rp)
 
         # Re-constract EXFOR dataframe and add trace to fig
-        rpex_dff = pd.read_json(stored_exps_rp)
+        rpex_dff = stored_frame(stored_exps_rp)
 
-    except:
+    except KeyError:
         rplib_dff = pd.DataFrame()
         rpex_dff = pd.DataFrame()
         raise PreventUpdate
 
     if rplib_dff.empty and rpex_dff.empty:
-        fig = px.scatter(title="No data found")
-        fig.update_layout(title_font_color="orange")
+        fig = no_data_figure()
 
     if not rplib_dff.empty:
-        ll = rplib_dff["lib"].unique()
-        for l in ll:
-            # new_col = next(line_color)
-            line_color = color_libs(l)
-            new_col = next(line_color)
-            fig.add_trace(
-                go.Scatter(
-                    x=rplib_dff[rplib_dff["lib"] == l]["Energy"],
-                    y=rplib_dff[rplib_dff["lib"] == l]["XS"],
-                    showlegend=True,
-                    line_color=new_col,
-                    name=l,
-                    mode="lines",
-                )
-            )
+        fig["data"] += lib_traces(rplib_dff, "Energy", "XS")
+
+    if not rpex_dff.empty:
+        fig["data"] += exfor_traces(
+            rpex_dff,
+            ["entry"],
+            "Energy",
+            "XS",
+            label_year,
+            dx="dE",
+            dy="dXS",
+            size=6,
+        )
+
+    return check_figure(fig)
+
+
+# ------------------------------------------------------------------------------
+# Data table and download links of the selected tab
+#
+@app.callback(
+    [Output("exfor_table_rp", "data"), Output("file_list_rp", "children")],
+    [
+        Input("tabs-rp", "active_tab"),
+        Input("stored_exps_rp", "data"),
+        Input("stored_libfiles_rp", "children"),
+        Input("stored_exfiles_rp", "children"),
+    ],
+)
+def update_tabs_rp(slctd_tab_rp, stored_exps_rp, libfiles, exfiles):
+    if slctd_tab_rp == "ds-rp":
+        return dash.no_update, dash.no_update
+
+    if not stored_exps_rp:
+        raise PreventUpdate
+
+    try:
+        rpex_dff = stored_frame(stored_exps_rp)
+    except KeyError:
+        raise PreventUpdate
 
     if not rpex_dff.empty:
-        ee = rpex_dff["entry"].unique()
-        rpex_dff_dt = rpex_dff.query("entry in @ee")
-        rpex_dff_dt = rpex_dff_dt[
+        rpex_dff_dt = rpex_dff[
             ["author", "year", "entry", "Energy", "dE", "XS", "dXS"]
         ]
-
-        i = 0
-        for e in ee:
-            label = (
-                str(rpex_dff[rpex_dff["entry"] == e]["author"].unique())
-                + ","
-                + str(rpex_dff[rpex_dff["entry"] == e]["year"].unique())
-            )
-            label = re.sub("\[|\]|'", "", label)
-            fig.add_trace(
-                go.Scatter(
-                    x=rpex_dff[rpex_dff["entry"] == e]["Energy"],
-                    y=rpex_dff[rpex_dff["entry"] == e]["XS"],
-                    error_x=dict(
-                        type="data", array=rpex_dff[rpex_dff["entry"] == e]["dE"]
-                    ),
-                    error_y=dict(
-                        type="data", array=rpex_dff[rpex_dff["entry"] == e]["dXS"]
-                    ),
-                    showlegend=True,
-                    name=label,
-                    marker=dict(size=6, symbol=i),
-                    mode="markers",
-                )
-            )
-            i += 1
     else:
         rpex_dff_dt = pd.DataFrame()
 
-    # return content basend on the selected tab
-    if slctd_tab_rp == "ds-rp":
-        return fig, dash.no_update, dash.no_update
-
-    elif slctd_tab_rp == "datatable-rp":
-        return fig, rpex_dff_dt.to_dict("records"), dash.no_update
+    if slctd_tab_rp == "datatable-rp":
+        return rpex_dff_dt.to_dict("records"), dash.no_update
 
     elif slctd_tab_rp == "dl-rp":
         csv_string = rpex_dff_dt.to_csv(index=False, encoding="utf-8")
@@ -576,7 +642,19 @@ def update_figure_rp(
             ]
         )
 
-        return fig, dash.no_update, downloadcorrections
+        return dash.no_update, downloadcorrections
+
+
+# Linear/Log switch without the server, see assets/clientside.js
+app.clientside_callback(
+    ClientsideFunction(namespace="figs", function_name="axes"),
+    Output("main_graph_rp", "figure"),
+    [
+        Input("stored_fig_rp", "data"),
+        Input("xaxis_type3", "value"),
+        Input("yaxis_type3", "value"),
+    ],
+)
 
 
 @app.callback(
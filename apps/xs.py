@@ -7,7 +7,6 @@
 #
 ####################################################################
 
-import re
 from urllib.parse import quote, urlencode
 
 import dash
@@ -17,20 +16,33 @@ from dash import html
 
 import dash_bootstrap_components as dbc
 import pandas as pd
-import plotly.express as px  # (version 4.7.0)
-import plotly.graph_objects as go
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State, ClientsideFunction
 from dash.exceptions import PreventUpdate
 from dash_extensions import Download
 
 from app import app
 from datahandle.checkdata import input_check
 from datahandle.exfor_cs import read_exfor
-from datahandle.figs import default_axis, default_chart
+from datahandle.figs import (
+    default_axis,
+    default_chart,
+    no_data_figure,
+    check_figure,
+    lib_traces,
+    exfor_traces,
+    label_year,
+)
 from datahandle.genlinks import list_libfiles, list_exfiles, genzip
 from datahandle.index_cs import read_index
 from datahandle.library_cs import read_libs
-from datahandle.list import read_mt, color_libs, limit_by_datapoints
+from datahandle.list import read_mt, limit_by_datapoints
+from datahandle.store import (
+    encode_frame,
+    decode_frame,
+    frame_source,
+    split_entries,
+    stored_frame,
+)
 from datahandle.tabs import create_tabs
 from urlparser import parse_state, apply_default_value
 
@@ -214,9 +226,12 @@ layout = (
             tabs_inputs,
             # hidden div tag to store data
             html.Div(id="stored_input", style={"display": "none"}),
-            html.Div(id="stored_libs", style={"display": "none"}),
-            html.Div(id="stored_exps", style={"display": "none"}),
-            html.Div(id="stored_index", style={"display": "none"}),
+            dcc.Store(id="stored_libs"),
+            dcc.Store(id="stored_exps"),
+            dcc.Store(id="stored_fig"),
+            dcc.Store(id="zoom_cs"),
+            dcc.Store(id="exps_request_cs"),
+            dcc.Store(id="exps_delta_cs"),
             html.Div(id="stored_libfiles", style={"display": "none"}),
             html.Div(id="stored_exfiles", style={"display": "none"}),
         ],
@@ -260,9 +275,9 @@ def update_url_state(*values):
         Output("yaxis_type", "value"),
         Output("index_table_cs", "selected_rows"),
         Output("index_table_cs", "data"),
-        Output("stored_libs", "children"),
+        Output("stored_libs", "data"),
         Output("stored_libfiles", "children"),
-        Output("stored_index", "children"),
+        Output("stored_exfiles", "children"),
     ],
     [
         Input("target_elem", "value"),
@@ -295,6 +310,9 @@ def load_index(target_elem, target_mass, reaction, groupwise):
         # read .list file and load index dataframe
         index_df = read_index(nuclide, reaction, mt)
 
+        # EXFORTABLES files for download, data is read on selection
+        exfiles, _ = read_exfor(nuclide, reaction, mt, [])
+
         if not index_df.empty:
             default_sel = limit_by_datapoints(index_df)
 
@@ -326,9 +344,9 @@ def load_index(target_elem, target_mass, reaction, groupwise):
         yaxis_type,
         default_sel,
         index_df.to_dict("records"),
-        lib_df.to_json(),
+        encode_frame(lib_df, ["xs.libs", [nuclide, reaction, mt, groupwise]]),
         libfiles,
-        index_df.to_json(),
+        exfiles,
     )
 
 
@@ -336,34 +354,51 @@ def load_index(target_elem, target_mass, reaction, groupwise):
 # 2. Read Experimental data
 #
 #
-@app.callback(
-    [Output("stored_exfiles", "children"), Output("stored_exps", "children")],
+app.clientside_callback(
+    ClientsideFunction(namespace="exps", function_name="select"),
+    [Output("stored_exps", "data"), Output("exps_request_cs", "data")],
     [
         Input("stored_input", "children"),
-        Input("stored_index", "children"),
         Input("index_table_cs", "selected_rows"),
+        Input("exps_delta_cs", "data"),
     ],
+    [State("index_table_cs", "data"), State("stored_exps", "data")],
 )
-def build_expdf(userinput, stored_index, slctd_rows):
-    if userinput:
-        nuclide, reaction, mt = userinput.split("-")
-    else:
-        raise PreventUpdate
 
-    try:
-        index_dff = pd.read_json(stored_index)
-    except:
-        raise PreventUpdate
 
-    if not index_dff.empty:
-        ee = index_dff["entry"].iloc[slctd_rows]
-        ee = ee.astype(str).to_list()
+@app.callback(
+    Output("exps_delta_cs", "data"),
+    [Input("exps_request_cs", "data")],
+)
+def build_expdf(request):
+    # only datasets newly selected in index_table_cs are requested,
+    # deselected ones are dropped in the browser (assets/clientside.js)
+    if request:
+        nuclide, reaction, mt = request["input"].split("-")
     else:
-        ee = []
+        raise PreventUpdate
+
+    ee = [str(e[0]) for e in request["entries"].values()]
 
     exfiles, exfor_df = read_exfor(nuclide, reaction, mt, ee)
 
-    return exfiles, exfor_df.to_json(double_precision=12)
+    return {
+        "input": request["input"],
+        "entries": split_entries(
+            exfor_df, request["entries"].keys(), ["xs.exfor", [nuclide, reaction, mt]]
+        ),
+    }
+
+
+# frames of the server side store read again when expired, see datahandle/store.py
+@frame_source("xs.libs")
+def libs_frame(nuclide, reaction, mt, groupwise):
+    return read_libs(nuclide, reaction, mt, groupwise)[1]
+
+
+@frame_source("xs.exfor")
+def exfor_frame(nuclide, reaction, mt, entry):
+    return read_exfor(nuclide, reaction, mt, [entry])[1]
 
 
 # ------------------------------------------------------------------------------
@@ -371,116 +406,95 @@ def build_expdf(userinput, stored_index, slctd_rows):
 #
 #
 @app.callback(
+    Output("stored_fig", "data"),
     [
-        Output("main_graph", "figure"),
-        Output("exfor_table_cs", "data"),
-        Output("file_list_cs", "children"),
+        Input("stored_input", "children"),
+        Input("stored_libs", "data"),
+        Input("stored_exps", "data"),
+        Input("zoom_cs", "data"),
     ],
     [
-        Input("stored_input", "children"),
-        Input("tabs-cs", "active_tab"),
-        Input("stored_libs", "children"),
-        Input("stored_exps", "children"),
-        Input("xaxis_type", "value"),
-        Input("yaxis_type", "value"),
-        Input("stored_libfiles", "children"),
-        Input("stored_exfiles", "children"),
+        State("xaxis_type", "value"),
+        State("yaxis_type", "value"),
+        State("groupwise", "value"),
     ],
 )
 def update_figure(
-    userinput,
-    slctd_tab,
-    stored_libs,
-    stored_exps,
-    xaxis_type,
-    yaxis_type,
-    libfiles,
-    exfiles,
+    userinput, stored_libs, stored_exps, zoom, xaxis_type, yaxis_type, groupwise
 ):
     if userinput:
         nuclide, reaction, mt = userinput.split("-")
 
-        # Fig definition
+        # Fig definition, the zoom is kept until a new reaction or library
+        # selection (pointwise/groupwise)
         fig = default_chart(xaxis_type, yaxis_type, reaction, mt)
+        fig["layout"]["uirevision"] = "-".join([userinput, "".join(groupwise or [])])
     else:
         raise PreventUpdate
 
+    if not stored_libs or not stored_exps:
+        raise PreventUpdate
+
     try:
         # Re-constract library dataframe and add trace to fig
-        lib_dff = pd.read_json(stored_libs)
+        lib_dff = decode_frame(stored_libs)
 
         # Re-constract EXFOR dataframe and add trace to fig
-        exfor_dff = pd.read_json(stored_exps)
+        exfor_dff = stored_frame(stored_exps)
 
-    except:
+    except KeyError:
         exfor_dff = pd.DataFrame()
         lib_dff = pd.DataFrame()
         raise PreventUpdate
 
     if lib_dff.empty and exfor_dff.empty:
-        fig = px.scatter(title="No data found")
-        fig.update_layout(title_font_color="orange")
+        fig = no_data_figure()
 
     if not lib_dff.empty:
-        ll = lib_dff["lib"].unique()
-        for l in ll:
-            line_color = color_libs(l)
-            new_col = next(line_color)
-            # new_col = color_libs(l)
-            fig.add_trace(
-                go.Scatter(
-                    x=lib_dff[lib_dff["lib"] == l]["Energy"],
-                    y=lib_dff[lib_dff["lib"] == l]["XS"],
-                    showlegend=True,
-                    line_color=new_col,
-                    name=l,
-                    mode="lines",
-                )
-            )
+        fig["data"] += lib_traces(lib_dff, "Energy", "XS", window=zoom)
+
+    if not exfor_dff.empty:
+        fig["data"] += exfor_traces(
+            exfor_dff, ["entry"], "Energy", "XS", label_year, dx="dE", dy="dXS"
+        )
+
+    return check_figure(fig)
+
+
+# ------------------------------------------------------------------------------
+# 3. Update data table and download links of the selected tab
+#
+#
+@app.callback(
+    [Output("exfor_table_cs", "data"), Output("file_list_cs", "children")],
+    [
+        Input("tabs-cs", "active_tab"),
+        Input("stored_exps", "data"),
+        Input("stored_libfiles", "children"),
+        Input("stored_exfiles", "children"),
+    ],
+)
+def update_tabs(slctd_tab, stored_exps, libfiles, exfiles):
+    if slctd_tab == "ds-cs":
+        return dash.no_update, dash.no_update
+
+    if not stored_exps:
+        raise PreventUpdate
+
+    try:
+        exfor_dff = stored_frame(stored_exps)
+    except KeyError:
+        raise PreventUpdate
 
     if not exfor_dff.empty:
-        ee = exfor_dff["entry"].unique()
-        exfor_dff_dt = exfor_dff.query("entry in @ee")
-        exfor_dff_dt = exfor_dff_dt[
+        exfor_dff_dt = exfor_dff[
             ["author", "year", "entry", "Energy", "dE", "XS", "dXS"]
         ]
-        # exfor_table = exfor_dff_dt.to_dict('records')      # for download
-
-        i = 0
-        for e in ee:
-            label = (
-                str(exfor_dff[exfor_dff["entry"] == e]["author"].unique())
-                + ","
-                + str(exfor_dff[exfor_dff["entry"] == e]["year"].unique())
-            )
-            label = re.sub("\[|\]|'", "", label)
-            fig.add_trace(
-                go.Scatter(
-                    x=exfor_dff[exfor_dff["entry"] == e]["Energy"],
-                    y=exfor_dff[exfor_dff["entry"] == e]["XS"],
-                    error_x=dict(
-                        type="data", array=exfor_dff[exfor_dff["entry"] == e]["dE"]
-                    ),
-                    error_y=dict(
-                        type="data", array=exfor_dff[exfor_dff["entry"] == e]["dXS"]
-                    ),
-                    showlegend=True,
-                    name=label,
-                    marker=dict(size=8, symbol=i),
-                    mode="markers",
-                )
-            )
-            i += 1
     else:
         exfor_dff_dt = pd.DataFrame()
-        # exfor_table = []
-
-    # return content basend on the selected tab
-    if slctd_tab == "ds-cs":
-        return fig, dash.no_update, dash.no_update
 
     if slctd_tab == "datatable-cs":
-        return fig, exfor_dff_dt.to_dict("records"), dash.no_update
+        return exfor_dff_dt.to_dict("records"), dash.no_update
 
     elif slctd_tab == "dl-cs":
         csv_string = exfor_dff_dt.to_csv(index=False, encoding="utf-8")
@@ -512,7 +526,33 @@ def update_figure(
                 html.Div(children=libflinks),
             ]
         )
-        return fig, dash.no_update, downloadcorrections
+        return dash.no_update, downloadcorrections
+
+
+# Linear/Log switch without the server, see assets/clientside.js
+app.clientside_callback(
+    ClientsideFunction(namespace="figs", function_name="axes"),
+    Output("main_graph", "figure"),
+    [
+        Input("stored_fig", "data"),
+        Input("xaxis_type", "value"),
+        Input("yaxis_type", "value"),
+    ],
+)
+
+
+# energy window of zoom or range slider, see assets/clientside.js
+app.clientside_callback(
+    ClientsideFunction(namespace="zoom", function_name="window"),
+    Output("zoom_cs", "data"),
+    [
+        Input("main_graph", "relayoutData"),
+        Input("xaxis_type", "value"),
+        Input("yaxis_type", "value"),
+        Input("stored_libs", "data"),
+    ],
+    [State("zoom_cs", "data")],
+)
 
 
 @app.callback(
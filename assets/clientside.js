@@ -0,0 +1,187 @@
+/*
+ * Clientside callbacks of the dataexplorer, registered in apps/*.py
+ */
+
+/* ---------------------------------------------------------------------------
+ * Experimental data selection
+ *
+ * stored = {input: userinput, entries: {key: {data: ..., files: [...]}}}
+ * Deselected datasets are dropped here, newly selected ones are returned as
+ * a request for the server, whose answer comes back as delta.
+ */
+function rowKey(row, fields) {
+    return fields.map(function (f) { return String(row[f]); }).join("_");
+}
+
+function selectRows(fields, userinput, selected_rows, delta, rows, stored) {
+    if (!userinput) {
+        throw window.dash_clientside.PreventUpdate;
+    }
+
+    var current = (stored && stored.input === userinput) ? stored.entries : {};
+    var received = (delta && delta.input === userinput) ? delta.entries : {};
+    var changed = !stored || stored.input !== userinput;
+    var entries = {};
+    var missing = {};
+    var wanted = {};
+
+    (selected_rows || []).forEach(function (i) {
+        if (rows && i < rows.length) {
+            wanted[rowKey(rows[i], fields)] = fields.map(function (f) { return rows[i][f]; });
+        }
+    });
+
+    Object.keys(wanted).forEach(function (key) {
+        if (key in current) {
+            entries[key] = current[key];
+        } else if (key in received) {
+            entries[key] = received[key];
+            changed = true;
+        } else {
+            missing[key] = wanted[key];
+        }
+    });
+
+    Object.keys(current).forEach(function (key) {
+        if (!(key in wanted)) {
+            changed = true;
+        }
+    });
+
+    return [
+        changed ? {input: userinput, entries: entries} : window.dash_clientside.no_update,
+        Object.keys(missing).length ? {input: userinput, entries: missing} : window.dash_clientside.no_update,
+    ];
+}
+
+function storedFiles(stored) {
+    var files = [];
+    Object.keys(stored.entries).forEach(function (key) {
+        files = files.concat(stored.entries[key].files || []);
+    });
+    return files;
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    exps: {
+        // xs and residual: a dataset is identified by its entry
+        select: function (userinput, selected_rows, delta, rows, stored) {
+            return selectRows(["entry"], userinput, selected_rows, delta, rows, stored);
+        },
+        // FY: by entry and incident energy, also returns the file names
+        select_fy: function (userinput, selected_rows, delta, rows, stored) {
+            var out = selectRows(["entry", "einc"], userinput, selected_rows, delta, rows, stored);
+            var files = (out[0] === window.dash_clientside.no_update) ?
+                window.dash_clientside.no_update : storedFiles(out[0]);
+            return [out[0], out[1], files];
+        },
+    },
+});
+
+/* ---------------------------------------------------------------------------
+ * Linear/Log switching
+ *
+ * Figures are built on the server into a dcc.Store and only their axis types
+ * are changed here. Ranges depending on the axis type are given by the server
+ * in layout.meta as {xrange: {Linear: [...], Log: [...]}}.
+ * x arrays shared by several traces are sent once in layout.meta.x and the
+ * traces refer to them as "@x<i>" (datahandle/figs.py).
+ */
+function setAxis(axis, type, ranges) {
+    axis = Object.assign({}, axis, {type: (type === "Log") ? "log" : "linear"});
+    if (ranges && ranges[type]) {
+        axis.range = ranges[type];
+    }
+    return axis;
+}
+
+function expandX(data, xs) {
+    if (!xs) {
+        return data;
+    }
+    return data.map(function (trace) {
+        var ref = (typeof trace.x === "string") && trace.x.match(/^@x(\d+)$/);
+        return ref ? Object.assign({}, trace, {x: xs[Number(ref[1])]}) : trace;
+    });
+}
+
+function withAxes(figure, xaxis_type, yaxis_type) {
+    if (!figure) {
+        throw window.dash_clientside.PreventUpdate;
+    }
+
+    var layout = Object.assign({}, figure.layout);
+    var meta = layout.meta || {};
+    // the user's zoom is kept over new data, but not over a new axis type
+    if (layout.uirevision) {
+        layout.uirevision = [layout.uirevision, xaxis_type, yaxis_type].join("-");
+    }
+    if (xaxis_type) {
+        layout.xaxis = setAxis(layout.xaxis, xaxis_type, meta.xrange);
+    }
+    if (yaxis_type) {
+        layout.yaxis = setAxis(layout.yaxis, yaxis_type, meta.yrange);
+    }
+    if (meta.x) {
+        layout.meta = Object.assign({}, meta, {x: undefined});
+    }
+
+    return Object.assign({}, figure, {
+        data: expandX(figure.data || [], meta.x),
+        layout: layout,
+    });
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    figs: {
+        // xs, libs and residual
+        axes: function (figure, xaxis_type, yaxis_type) {
+            return withAxes(figure, xaxis_type, yaxis_type);
+        },
+        // FY, the x axis is always linear
+        yaxis: function (figure, yaxis_type) {
+            return withAxes(figure, null, yaxis_type);
+        },
+    },
+});
+
+/* ---------------------------------------------------------------------------
+ * Zoom window
+ *
+ * Energy window [x0, x1] in eV of the x axis, from relayoutData of the graph
+ * (zoom or range slider). The server adds the library points inside it in
+ * full resolution. A new data set or axis type resets it, only if it is set,
+ * so that an axis switch without zoom does not go to the server.
+ */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    zoom: {
+        window: function (relayout, xaxis_type, yaxis_type, data, current) {
+            var triggered = window.dash_clientside.callback_context.triggered.map(
+                function (t) { return t.prop_id; }
+            );
+            if (!triggered.some(function (p) { return p.endsWith(".relayoutData"); })) {
+                return current ? null : window.dash_clientside.no_update;
+            }
+            if (!relayout) {
+                return window.dash_clientside.no_update;
+            }
+            if (relayout["xaxis.autorange"]) {
+                return current ? null : window.dash_clientside.no_update;
+            }
+
+            var range = relayout["xaxis.range"] ||
+                [relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]];
+            if (range[0] === undefined || range[1] === undefined) {
+                return window.dash_clientside.no_update;
+            }
+
+            var x0 = Number(range[0]);
+            var x1 = Number(range[1]);
+            if (xaxis_type === "Log") {
+                x0 = Math.pow(10, x0);
+                x1 = Math.pow(10, x1);
+            }
+            return [Math.min(x0, x1), Math.max(x0, x1)];
+        },
+    },
+});
@@ -0,0 +1,87 @@
+####################################################################
+#
+# This file is part of libraries-2021 dataexplorer, https://nds.iaea.org/dataexplorer/.
+# Copyright (C) 2022 International Atomic Energy Agency (IAEA)
+#
+# Contact:    nds.contact-point@iaea.org
+#
+####################################################################
+
+# Size and latency of the browser payloads: pandas JSON vs datahandle/codec.py
+# Run "python -m benchmarks.bench_codec" from the top directory.
+
+import json
+import time
+from io import StringIO
+import numpy as np
+import pandas as pd
+
+from datahandle.codec import encode_columns, decode_columns
+
+
+def lib_frame(npoints, libs):
+    # pointwise curves like tables/xs of TENDL
+    dfs = []
+    for lib in libs:
+        energy = np.sort(np.random.uniform(1e-5, 2e8, npoints))
+        dfs.append(
+            pd.DataFrame(
+                {
+                    "Energy": energy,
+                    "XS": np.random.lognormal(0, 3, npoints),
+                    "lib": lib,
+                }
+            )
+        )
+    return pd.concat(dfs, ignore_index=True)
+
+
+def exfor_frame(npoints, nsets):
+    # EXFOR datasets as returned by create_exfordf, values with 6 digits
+    dfs = []
+    for i in range(nsets):
+        energy = np.round(np.random.uniform(1e3, 2e7, npoints), -1)
+        dfs.append(
+            pd.DataFrame(
+                {
+                    "Energy": energy,
+                    "XS": np.float64(np.float32(np.random.uniform(0, 2, npoints))),
+                    "dXS": np.float64(np.float32(np.random.uniform(0, 0.1, npoints))),
+                    "dE": np.nan,
+                    "author": "Author%d" % i,
+                    "entry": "%05d%03d" % (10000 + i, 2),
+                    "year": 1960 + i,
+                }
+            )
+        )
+    return pd.concat(dfs, ignore_index=True)
+
+
+def timeit(func, repeat=5):
+    t = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = func()
+        t.append(time.perf_counter() - t0)
+    return out, min(t) * 1e3
+
+
+def compare(name, df):
+    print(name, df.shape)
+    print("  %-22s %12s %10s %10s" % ("", "bytes", "enc [ms]", "dec [ms]"))
+
+    js, t_enc = timeit(lambda: df.to_json(double_precision=12))
+    _, t_dec = timeit(lambda: pd.read_json(StringIO(js)))
+    print("  %-22s %12d %10.1f %10.1f" % ("to_json/read_json", len(js), t_enc, t_dec))
+
+    cols, t_enc = timeit(lambda: json.dumps(encode_columns(df)))
+    back, t_dec = timeit(lambda: decode_columns(json.loads(cols)))
+    print("  %-22s %12d %10.1f %10.1f" % ("codec", len(cols), t_enc, t_dec))
+
+    assert back.equals(df.reset_index(drop=True).astype(back.dtypes.to_dict()))
+
+
+if __name__ == "__main__":
+    np.random.seed(0)
+    compare("library curves", lib_frame(30000, ["tendl.2021", "endfb8.0", "jeff3.3"]))
+    compare("EXFOR datasets", exfor_frame(200, 40))
@@ -0,0 +1,137 @@
+####################################################################
+#
+# This file is part of libraries-2021 dataexplorer, https://nds.iaea.org/dataexplorer/.
+# Copyright (C) 2022 International Atomic Energy Agency (IAEA)
+#
+# Contact:    nds.contact-point@iaea.org
+#
+####################################################################
+
+# Figure construction time, plotly graph objects vs datahandle/figs.py
+# for an Au-197(n,g) plot with 7 libraries and 40 EXFOR datasets.
+# Run "python -m benchmarks.bench_figs" from the top directory.
+
+import json
+import time
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.graph_objects as go
+
+from datahandle.figs import default_chart, lib_traces, exfor_traces, label_year
+from datahandle.list import color_libs
+
+LIBS = ["tendl.2021", "endfb8.0", "jeff3.3", "jendl5.0", "cendl3.2", "iaea.2019", "irdff2.0"]
+
+
+def frames(nlib=30000, nsets=40, npoints=50):
+    np.random.seed(0)
+    lib_df = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "Energy": np.sort(np.random.uniform(1e-5, 2e7, nlib)),
+                    "XS": np.random.lognormal(0, 3, nlib),
+                    "lib": l,
+                }
+            )
+            for l in LIBS
+        ],
+        ignore_index=True,
+    )
+    exfor_df = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "Energy": np.sort(np.random.uniform(1e3, 2e7, npoints)),
+                    "XS": np.random.uniform(0, 2, npoints),
+                    "dXS": np.random.uniform(0, 0.1, npoints),
+                    "dE": np.random.uniform(0, 1e3, npoints),
+                    "author": "Author%d" % i,
+                    "entry": "%05d%03d" % (10000 + i, 2),
+                    "year": 1960 + i,
+                }
+            )
+            for i in range(nsets)
+        ],
+        ignore_index=True,
+    )
+    return lib_df, exfor_df
+
+
+def graph_objects(lib_df, exfor_df):
+    # as the figure callbacks did before
+    fig = go.Figure(
+        layout=go.Layout(
+            xaxis={
+                "title": "Incident energy [eV]",
+                "type": "log",
+                "rangeslider": {"bgcolor": "White", "autorange": True, "thickness": 0.15},
+            },
+            yaxis={"title": "Cross section [barn]", "type": "log", "fixedrange": False},
+            margin={"l": 40, "b": 40, "t": 30, "r": 0},
+        )
+    )
+    fig.update_xaxes(exponentformat="power")
+    fig.update_yaxes(exponentformat="power")
+
+    for l in lib_df["lib"].unique():
+        df = lib_df[lib_df["lib"] == l]
+        fig.add_trace(
+            go.Scatter(
+                x=df["Energy"],
+                y=df["XS"],
+                showlegend=True,
+                line_color=next(color_libs(l)),
+                name=l,
+                mode="lines",
+            )
+        )
+
+    for i, e in enumerate(exfor_df["entry"].unique()):
+        df = exfor_df[exfor_df["entry"] == e]
+        fig.add_trace(
+            go.Scatter(
+                x=df["Energy"],
+                y=df["XS"],
+                error_x=dict(type="data", array=df["dE"]),
+                error_y=dict(type="data", array=df["dXS"]),
+                showlegend=True,
+                name=label_year(df),
+                marker=dict(size=8, symbol=i),
+                mode="markers",
+            )
+        )
+
+    return fig
+
+
+def plain_dicts(lib_df, exfor_df):
+    fig = default_chart("Log", "Log", "n,g", "102")
+    fig["data"] += lib_traces(lib_df, "Energy", "XS")
+    fig["data"] += exfor_traces(
+        exfor_df, ["entry"], "Energy", "XS", label_year, dx="dE", dy="dXS"
+    )
+    return fig
+
+
+def timeit(func, repeat=5):
+    t = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        t.append(time.perf_counter() - t0)
+    return min(t) * 1e3
+
+
+if __name__ == "__main__":
+    lib_df, exfor_df = frames()
+    print("Au-197(n,g): %d libraries, %d datasets" % (len(LIBS), exfor_df["entry"].nunique()))
+    print("  %-16s %10s %12s" % ("", "build [ms]", "+json [ms]"))
+
+    for name, build in [("graph objects", graph_objects), ("plain dicts", plain_dicts)]:
+        t_build = timeit(lambda: build(lib_df, exfor_df))
+        t_json = timeit(
+            lambda: json.dumps(build(lib_df, exfor_df), cls=plotly.utils.PlotlyJSONEncoder)
+        )
+        print("  %-16s %10.1f %12.1f" % (name, t_build, t_json))
@@ -0,0 +1,83 @@
+####################################################################
+#
+# This file is part of libraries-2021 dataexplorer, https://nds.iaea.org/dataexplorer/.
+# Copyright (C) 2022 International Atomic Energy Agency (IAEA)
+#
+# Contact:    nds.contact-point@iaea.org
+#
+####################################################################
+
+# Y(A) of fission yields, the former loop over libraries and masses vs the
+# grouped reduction of datahandle/library_fy.create_libYA, on the U-235
+# thermal yield tables of every library of LIB_LIST_FY found in LIB_PATH_FY.
+# Run "python -m benchmarks.bench_fy" from the top directory.
+
+import time
+import pandas as pd
+
+from datahandle.list import LIB_LIST_FY, MT_LIST_FY
+from datahandle.catalog import find_lib
+from datahandle.library_fy import create_libYA, read_fytable
+
+
+def frames(mt):
+    # U-235 thermal yield tables as passed to create_libYA
+    dfs = []
+    for l in LIB_LIST_FY:
+        lfname = find_lib("n", "U235", l, "FY", mt, variant="2.53E-08")
+        if lfname:
+            libfy_df = pd.DataFrame(
+                read_fytable(lfname), columns=["Z", "A", "M", "FPY", "dFPY"]
+            )
+            libfy_df = libfy_df.astype({"Z": "int", "A": "int", "M": "int"})
+            libfy_df["lib"] = l
+            dfs.append(libfy_df)
+
+    if not dfs:
+        return pd.DataFrame()
+
+    return pd.concat(dfs, ignore_index=True)
+
+
+def loops(libfy_df, fytype):
+    # as create_libYA did before
+    aa = []
+    for l in libfy_df["lib"].unique():
+        for a in range(60, 180):
+            if fytype == "Independent":
+                ay = libfy_df[(libfy_df["A"] == a) & (libfy_df["lib"] == l)][
+                    "FPY"
+                ].sum()
+            if fytype == "Cumulative":
+                ay = libfy_df[(libfy_df["A"] == a) & (libfy_df["lib"] == l)][
+                    "FPY"
+                ].max()
+            aa.append({"A": a, "FPY": ay, "lib": l})
+    return pd.DataFrame(aa)
+
+
+def timeit(func, repeat=5):
+    t = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        t.append(time.perf_counter() - t0)
+    return min(t) * 1e3
+
+
+if __name__ == "__main__":
+    print("U-235 thermal yield tables of LIB_PATH_FY")
+    print("  %-12s %10s %10s %12s" % ("", "rows", "loops [ms]", "grouped [ms]"))
+
+    for fytype in ["Independent", "Cumulative"]:
+        libfy_df = frames(dict(MT_LIST_FY)[fytype])
+        if libfy_df.empty:
+            print("  %-12s no table found" % fytype)
+            continue
+
+        t_loops = timeit(lambda: loops(libfy_df, fytype))
+        t_grouped = timeit(lambda: create_libYA(libfy_df, fytype))
+        print(
+            "  %-12s %10d %10.1f %12.1f"
+            % (fytype, len(libfy_df), t_loops, t_grouped)
+        )
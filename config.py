@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 DEVENV = False
 
@@ -17,3 +18,45 @@ EXP_PATH = os.path.join(DATA_ROOT_FOLDER, "libraries/")
 # for FY
 LIB_PATH_FY = os.path.join(LIB_PATH, "FY/")
 EXP_PATH_FY = os.path.join(LIB_PATH, "FY/")
+
+# binary (NPZ) copy of ENDFTABLES, see datahandle/libstore.py
+LIB_STORE_PATH = os.path.join(DATA_ROOT_FOLDER, "libstore/")
+
+# snapshot of the ENDFTABLES file catalog, see datahandle/catalog.py
+LIB_CATALOG = os.path.join(DATA_ROOT_FOLDER, "libcatalog.pickle")
+
+# snapshot of the residual products of each target, see datahandle/list_rp.py
+RP_INDEX = os.path.join(DATA_ROOT_FOLDER, "rpindex.pickle")
+
+# SQLite index of all EXFORTABLES .list files, see datahandle/index_db.py
+EXFOR_INDEX_DB = os.path.join(DATA_ROOT_FOLDER, "exforindex.sqlite")
+
+# manifests of the .list file generation, see datahandle/makelist.py
+MAKELIST_PATH = os.path.join(DATA_ROOT_FOLDER, "makelist/")
+
+# read EXFORTABLES and ENDFTABLES from the tar archives, {archive: path prefix of
+# the members}, instead of the untarred files, see file_utils.py
+TAR_ARCHIVES = {}
+# e.g. {os.path.join(DATA_ROOT_FOLDER, "exfortables.tar"): LIB_PATH,
+#       os.path.join(DATA_ROOT_FOLDER, "endftables.tar"): LIB_PATH}
+TAR_MMAP = True  # memory map the archives, else read the members by os.pread
+
+# in-memory cache of parsed tables, see datahandle/cache.py
+LIB_CACHE_BYTES = 512 * 1024 * 1024
+EXFOR_CACHE_BYTES = 256 * 1024 * 1024
+CACHE_STAT_TTL = 60  # seconds before a cached file is stat'ed again
+
+# server side store of the DataFrames passed between callbacks, see datahandle/store.py
+# if False, the frames are sent to the browser, encoded by datahandle/codec.py
+FRAME_STORE_SERVER = True
+FRAME_STORE_DIR = os.path.join(tempfile.gettempdir(), "dataexplorer-frames/")
+FRAME_STORE_TTL = 3600  # seconds
+FRAME_STORE_ITEMS = 500  # frames kept in memory per process
+FRAME_STORE_FILES = 5000  # frames pushed out of memory, kept on local disk
+
+# check every figure with plotly's graph objects, for tests, see datahandle/figs.py
+FIGURE_VALIDATE = False
+
+# points per library curve sent to the figures, 0 to send all, see datahandle/downsample.py
+LIB_POINT_BUDGET = 4000
+LIB_LOD_FACTOR = 4  # points of a level of detail / points of the coarser one
@@ -0,0 +1,144 @@
+####################################################################
+#
+# This file is part of libraries-2021 dataexplorer, https://nds.iaea.org/dataexplorer/.
+# Copyright (C) 2022 International Atomic Energy Agency (IAEA)
+#
+# Contact:    nds.contact-point@iaea.org
+#
+####################################################################
+
+import sys
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from config import LIB_CACHE_BYTES, EXFOR_CACHE_BYTES, CACHE_STAT_TTL
+from file_utils import file_stat
+
+# ------------------------------------------------------------------------------
+# Process level LRU cache of parsed data files
+#
+# Entries are keyed by file path and are valid as long as (mtime, size) of
+# the file is unchanged. The file is stat'ed at most once per stat_ttl seconds,
+# so a repeated query within that time costs no I/O. Eviction is bounded by
+# the total size of the cached values, not by the number of entries.
+# Cached values are shared between requests and must not be modified.
+#
+def nbytes_of(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (list, tuple)):
+        return sum(nbytes_of(v) for v in value)
+    if isinstance(value, dict):
+        return sum(nbytes_of(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+def freeze(value):
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, pd.DataFrame):
+        # object columns stay writable, pandas measures them through buffers
+        for block in value._mgr.blocks:
+            if isinstance(block.values, np.ndarray) and block.values.dtype != object:
+                block.values.flags.writeable = False
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            freeze(v)
+    elif isinstance(value, dict):
+        for v in value.values():
+            freeze(v)
+    return value
+
+
+class TableCache:
+    def __init__(self, max_bytes, stat_ttl=CACHE_STAT_TTL):
+        self.max_bytes = max_bytes
+        self.stat_ttl = stat_ttl
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # path: [(mtime, size), value, nbytes, checked]
+        self._lock = threading.Lock()
+
+    def get(self, path, loader):
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and now - entry[3] < self.stat_ttl:
+                return self._hit(path, entry)
+
+        ident = file_stat(path)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == ident:
+                entry[3] = now
+                return self._hit(path, entry)
+
+        value = freeze(loader(path))
+        self.put(path, ident, value, now)
+
+        return value
+
+    def _hit(self, path, entry):
+        self.hits += 1
+        self._entries.move_to_end(path)
+        return entry[1]
+
+    def put(self, path, ident, value, now):
+        nbytes = nbytes_of(value)
+
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(path, None)
+            if old:
+                self.nbytes -= old[2]
+
+            if nbytes > self.max_bytes:
+                return
+
+            self._entries[path] = [ident, value, nbytes, now]
+            self.nbytes += nbytes
+
+            while self.nbytes > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self.nbytes -= old[2]
+                self.evictions += 1
+
+    def drop(self, paths):
+        with self._lock:
+            for path in paths:
+                old = self._entries.pop(path, None)
+                if old:
+                    self.nbytes -= old[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "nbytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# shared by read_libs, read_resid_prod_lib, read_libs_lib and read_libfy
+LIB_CACHE = TableCache(LIB_CACHE_BYTES)
+
+# EXFORTABLES datasets of create_exfordf and create_exfy
+EXFOR_CACHE = TableCache(EXFOR_CACHE_BYTES)
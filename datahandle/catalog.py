@@ -0,0 +1,206 @@
+####################################################################
+#
+# This file is part of libraries-2021 dataexplorer, https://nds.iaea.org/dataexplorer/.
+# Copyright (C) 2022 International Atomic Energy Agency (IAEA)
+#
+# Contact:    nds.contact-point@iaea.org
+#
+####################################################################
+
+import os
+import re
+import time
+import pickle
+import threading
+
+from config import LIB_PATH, LIB_PATH_FY, LIB_STORE_PATH, LIB_CATALOG, CACHE_STAT_TTL
+from datahandle.list import PARTICLE, PARTICLE_FY
+from file_utils import dir_list, file_stat
+
+# ------------------------------------------------------------------------------
+# Catalog of ENDFTABLES files
+#
+# Maps (projectile, nuclide, library, table, MT/residual, isomer, variant)
+# to the file path, where table is "xs", "residual", "FY" or "store" and
+# variant is "G1102" for groupwise xs and the energy (e.g. "2.53E-08") for FY.
+# Stores are keyed with MT/residual "" (xs and residual) or "FY".
+# Loaded from the snapshot written by "python -m datahandle.catalog", when
+# the server starts. The snapshot holds the mtime of the library roots
+# (LIB_PATH/<inc_pt>/, LIB_PATH_FY/<inc_pt>/ and the store directories) and
+# is walked again, and rewritten, once they change, e.g. by a new nuclide or
+# a new binary store. The roots are stat'ed every CACHE_STAT_TTL seconds.
+# A library added to a nuclide already there needs a new snapshot.
+#
+XS_NAME = re.compile(r"^MT(\d{3})([a-z]*\d?)(?:-(G\d+))?$")
+RP_NAME = re.compile(r"^rp(\d{6})([a-z]*\d?)$")
+FY_NAME = re.compile(r"^MT(\d{3})-E(.+)$")
+
+_catalog = None
+_ident = None
+_checked = float("-inf")
+_lock = threading.Lock()
+
+
+def scan_dir(path):
+    try:
+        return sorted(dir_list(path))
+    except OSError:
+        return []
+
+
+def parse_libname(inc_pt, nuclide, lib, table, fname):
+    # e.g. n-Au197-MT102-G1102.tendl.2021.txt -> ("102", "", "G1102")
+    prefix = "".join([inc_pt, "-", nuclide, "-"])
+    suffix = "".join([".", lib, ".txt"])
+    if not (fname.startswith(prefix) and fname.endswith(suffix)):
+        return None
+
+    name = fname[len(prefix) : -len(suffix)]
+
+    if table == "xs":
+        m = XS_NAME.match(name)
+        if m:
+            return m.group(1), m.group(2), m.group(3) or ""
+
+    elif table == "residual":
+        m = RP_NAME.match(name)
+        if m:
+            return m.group(1), m.group(2), ""
+
+    elif table == "FY":
+        m = FY_NAME.match(name)
+        if m:
+            return m.group(1), "", m.group(2)
+
+    return None
+
+
+def scan_tables(catalog, root, particles, tables):
+    for inc_pt in particles:
+        for nuclide in scan_dir("".join([root, inc_pt])):
+            for lib in scan_dir("".join([root, inc_pt, "/", nuclide])):
+                for table in tables:
+                    path = "".join(
+                        [root, inc_pt, "/", nuclide, "/", lib, "/tables/", table, "/"]
+                    )
+                    for fname in scan_dir(path):
+                        key = parse_libname(inc_pt, nuclide, lib, table, fname)
+                        if key:
+                            catalog[(inc_pt, nuclide, lib, table) + key] = path + fname
+
+
+def scan_store(catalog):
+    for inc_pt in PARTICLE:
+        path = "".join([LIB_STORE_PATH, inc_pt, "/"])
+        for fname in scan_dir(path):
+            if fname.endswith(".npz"):
+                nuclide = fname[:-4]
+                catalog[(inc_pt, nuclide, "", "store", "", "", "")] = path + fname
+
+    for inc_pt in PARTICLE_FY:
+        path = "".join([LIB_STORE_PATH, "FY/", inc_pt, "/"])
+        for fname in scan_dir(path):
+            if fname.endswith(".npz"):
+                nuclide = fname[:-4]
+                catalog[(inc_pt, nuclide, "", "store", "FY", "", "")] = path + fname
+
+
+def library_roots():
+    roots = ["".join([LIB_PATH, inc_pt]) for inc_pt in PARTICLE]
+    roots += ["".join([LIB_PATH_FY, inc_pt]) for inc_pt in PARTICLE_FY]
+    roots += ["".join([LIB_STORE_PATH, inc_pt]) for inc_pt in PARTICLE]
+    roots += ["".join([LIB_STORE_PATH, "FY/", inc_pt]) for inc_pt in PARTICLE_FY]
+
+    return roots
+
+
+def roots_ident():
+    ident = []
+    for path in library_roots():
+        try:
+            ident.append(file_stat(path))
+        except OSError:
+            ident.append(None)
+
+    return ident
+
+
+def build_catalog():
+    catalog = {}
+    scan_tables(catalog, LIB_PATH, PARTICLE, ["xs", "residual"])
+    scan_tables(catalog, LIB_PATH_FY, PARTICLE_FY, ["FY"])
+    scan_store(catalog)
+
+    return catalog
+
+
+def save_catalog(catalog, ident):
+    tmp = LIB_CATALOG + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(
+            {"ident": ident, "catalog": catalog}, f, protocol=pickle.HIGHEST_PROTOCOL
+        )
+    os.replace(tmp, LIB_CATALOG)
+
+
+def load_catalog(ident):
+    try:
+        with open(LIB_CATALOG, "rb") as f:
+            saved = pickle.load(f)
+        if saved["ident"] == ident:
+            return saved["catalog"]
+    except (OSError, EOFError, KeyError, TypeError, pickle.UnpicklingError):
+        pass
+
+    return None
+
+
+def get_catalog():
+    global _catalog, _ident, _checked
+
+    now = time.monotonic()
+    if _catalog is not None and now - _checked < CACHE_STAT_TTL:
+        return _catalog
+
+    with _lock:
+        if _catalog is not None and now - _checked < CACHE_STAT_TTL:
+            return _catalog
+
+        ident = roots_ident()
+        if _catalog is None or ident != _ident:
+            catalog = load_catalog(ident)
+            if catalog is None:
+                # the libraries changed since the snapshot, or there is none
+                catalog = build_catalog()
+                try:
+                    save_catalog(catalog, ident)
+                except OSError:
+                    # read-only data directory, walk again in the next process
+                    pass
+            _catalog, _ident = catalog, ident
+
+        _checked = now
+
+    return _catalog
+
+
+def invalidate_catalog():
+    # the roots are stat'ed again at the next lookup
+    global _checked
+
+    _checked = float("-inf")
+
+
+def find_lib(inc_pt, nuclide, lib, table, code, iso="", variant=""):
+    return get_catalog().get((inc_pt, nuclide, lib, table, code, iso, variant))
+
+
+def find_store(inc_pt, nuclide, table=""):
+    return get_catalog().get((inc_pt, nuclide, "", "store", table, "", ""))
+
+
+if __name__ == "__main__":
+    ident = roots_ident()
+    catalog = build_catalog()
+    save_catalog(catalog, ident)
+    print(len(catalog), "files in", LIB_CATALOG)
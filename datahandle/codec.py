@@ -0,0 +1,86 @@
+####################################################################
+#
+# This file is part of libraries-2021 dataexplorer, https://nds.iaea.org/dataexplorer/.
+# Copyright (C) 2022 International Atomic Energy Agency (IAEA)
+#
+# Contact:    nds.contact-point@iaea.org
+#
+####################################################################
+
+import base64
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------------------
+# Columnar encoding of DataFrames kept in the browser
+#
+# {"n": rows, "cols": [[name, type, ...], ...]}
+#   float columns: ["f4"|"f8", base64], float32 only if it is lossless
+#   int columns:   ["i4"|"i8", base64]
+#   other columns: ["dict", values, "i1"|"i2"|"i4", base64 of codes],
+#                  code -1 is a missing value
+# Arrays are little endian. The row index is not kept.
+#
+def b64(arr, dtype):
+    return base64.b64encode(np.ascontiguousarray(arr, dtype=dtype).tobytes()).decode(
+        "ascii"
+    )
+
+
+def unb64(s, dtype):
+    return np.frombuffer(base64.b64decode(s), dtype=dtype)
+
+
+def code_type(n):
+    if n < 2**7:
+        return "i1"
+    elif n < 2**15:
+        return "i2"
+    return "i4"
+
+
+def encode_column(s):
+    if pd.api.types.is_float_dtype(s.dtype):
+        arr = s.to_numpy(dtype="float64")
+        arr32 = arr.astype("float32")
+        if np.array_equal(arr32.astype("float64"), arr, equal_nan=True):
+            return ["f4", b64(arr32, "<f4")]
+        return ["f8", b64(arr, "<f8")]
+
+    elif pd.api.types.is_integer_dtype(s.dtype) or pd.api.types.is_bool_dtype(
+        s.dtype
+    ):
+        arr = s.to_numpy(dtype="int64")
+        if len(arr) == 0 or (arr.min() >= -(2**31) and arr.max() < 2**31):
+            return ["i4", b64(arr, "<i4")]
+        return ["i8", b64(arr, "<i8")]
+
+    codes, values = pd.factorize(s, use_na_sentinel=True)
+    ct = code_type(len(values))
+
+    return ["dict", values.tolist(), ct, b64(codes, "<" + ct)]
+
+
+def decode_column(col):
+    if col[0] == "dict":
+        values = np.array(col[1] + [None], dtype=object)
+        return values[unb64(col[3], "<" + col[2])]
+
+    # back to the dtypes pandas would use
+    if col[0][0] == "f":
+        return unb64(col[1], "<" + col[0]).astype("float64")
+    return unb64(col[1], "<" + col[0]).astype("int64")
+
+
+def encode_columns(df):
+    return {
+        "n": len(df),
+        "cols": [[str(c)] + encode_column(df[c]) for c in df.columns],
+    }
+
+
+def decode_columns(payload):
+    return pd.DataFrame(
+        {col[0]: decode_column(col[1:]) for col in payload["cols"]},
+        index=pd.RangeIndex(payload["n"]),
+    )
@@ -0,0 +1,189 @@
+####################################################################
+#
+# This file is part of libraries-2021 dataexplorer, https://nds.iaea.org/dataexplorer/.
+# Copyright (C) 2022 International Atomic Energy Agency (IAEA)
+#
+# Contact:    nds.contact-point@iaea.org
+#
+####################################################################
+
+import numpy as np
+
+from config import LIB_POINT_BUDGET, LIB_LOD_FACTOR
+
+# ------------------------------------------------------------------------------
+# Decimation of library curves for the figures
+#
+# Largest-Triangle-Three-Buckets: the curve is cut into buckets and from each
+# bucket the point making the largest triangle with its neighbour buckets is
+# kept, so peaks and resonances survive. The first vertex is the average of
+# the previous bucket instead of the point selected there, which makes the
+# buckets independent and the whole pass vectorized.
+#
+# The axis type is switched in the browser, so picks in linear and in log
+# space are merged and the curve looks right on both scales.
+# Energies of a curve are sorted, a zoom window is cut by binary search.
+#
+def lttb(x, y, n):
+    # indices of n points of (x, y), x sorted
+    size = len(x)
+    if n >= size or n < 3:
+        return np.arange(size)
+
+    # first and last points are kept, n - 2 buckets in between
+    edges = np.linspace(1, size - 1, n - 1).astype(int)
+    lo, hi = edges[:-1], edges[1:]
+    width = (hi - lo).max()
+
+    idx = lo[:, None] + np.arange(width)[None, :]
+    mask = idx < hi[:, None]
+    idx = np.minimum(idx, size - 1)
+
+    bx, by = x[idx], y[idx]
+    count = mask.sum(axis=1)
+    mx = np.where(mask, bx, 0).sum(axis=1) / count
+    my = np.where(mask, by, 0).sum(axis=1) / count
+
+    # previous and next bucket averages, the end points at both ends
+    ax = np.concatenate([[x[0]], mx[:-1]])[:, None]
+    ay = np.concatenate([[y[0]], my[:-1]])[:, None]
+    cx = np.concatenate([mx[1:], [x[-1]]])[:, None]
+    cy = np.concatenate([my[1:], [y[-1]]])[:, None]
+
+    area = np.abs((ax - cx) * (by - ay) - (ax - bx) * (cy - ay))
+    area = np.where(mask, area, -1)
+    picks = idx[np.arange(len(lo)), np.argmax(area, axis=1)]
+
+    return np.concatenate([[0], picks, [size - 1]])
+
+
+def decimate(x, y, budget=LIB_POINT_BUDGET):
+    # indices of at most budget points, half picked on linear, half on log axes
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+
+    if not budget or len(x) <= budget:
+        return np.arange(len(x))
+
+    n = budget // 2
+    picks = lttb(x, np.nan_to_num(y), n)
+
+    positive = np.flatnonzero((x > 0) & (y > 0))
+    if len(positive):
+        log_picks = positive[lttb(np.log10(x[positive]), np.log10(y[positive]), n)]
+        picks = np.union1d(picks, log_picks)
+
+    return picks
+
+
+def window_slice(x, window):
+    # rows of sorted x inside window, with one more point on each side so
+    # that the line reaches the edges of the plot
+    i0 = max(np.searchsorted(x, window[0], side="left") - 1, 0)
+    i1 = min(np.searchsorted(x, window[1], side="right") + 1, len(x))
+
+    return i0, i1
+
+
+def decimate_frame(df, x, y, window=None, budget=LIB_POINT_BUDGET):
+    # with a zoom window [x0, x1], the points inside it are added to the
+    # decimated curve in full resolution (or within the budget)
+    if "lod" in df:
+        return level_frame(df, x, y, window, budget)
+
+    if not budget or len(df) <= budget:
+        return df
+
+    xs = df[x].to_numpy(dtype="float64")
+    ys = df[y].to_numpy(dtype="float64")
+    picks = decimate(xs, ys, budget)
+
+    if window:
+        i0, i1 = window_slice(xs, window)
+        picks = np.union1d(picks, i0 + decimate(xs[i0:i1], ys[i0:i1], budget))
+
+    return df.iloc[picks]
+
+
+# ------------------------------------------------------------------------------
+# Levels of detail
+#
+# Large tables are decimated once when the library store is built
+# (datahandle/libstore.py): level 0 has LIB_POINT_BUDGET points, each next
+# level LIB_LOD_FACTOR times more, and the last level is the full table.
+# The levels are stacked in one frame, coarsest first, with their number in
+# the "lod" column. A figure takes level 0 for the whole curve and, inside a
+# zoom window, the coarsest level with enough points there, so the work per
+# request depends on the points sent, not on the size of the table.
+# Without y, the levels are evenly spaced rows, the same for all tables on
+# the energy grid x (groupwise tables), so that curves stay on one grid.
+# The store has to be rebuilt after LIB_POINT_BUDGET or LIB_LOD_FACTOR change.
+#
+def pyramid(x, y=None, budget=LIB_POINT_BUDGET, factor=LIB_LOD_FACTOR):
+    # (rows, bounds): row indices of all levels, level k is rows[bounds[k]:bounds[k + 1]]
+    size = len(x)
+    levels = []
+
+    n = budget
+    while budget and n < size:
+        if y is None:
+            levels.append(np.linspace(0, size - 1, n).astype(int))
+        else:
+            levels.append(decimate(x, y, n))
+        n *= factor
+
+    levels.append(np.arange(size))
+    bounds = np.cumsum([0] + [len(l) for l in levels])
+
+    return np.concatenate(levels), bounds
+
+
+def plot_level(df, budget=LIB_POINT_BUDGET):
+    # the level of each table taken for the whole curve, the frames of several
+    # tables are stacked one after the other, each one from its level 0
+    if df.empty or "lod" not in df:
+        return df
+
+    lod = df["lod"].to_numpy()
+    if budget:
+        return df[lod == 0]
+
+    starts = np.flatnonzero(np.diff(lod, prepend=lod[0] + 1) < 0)
+    last = np.repeat(np.maximum.reduceat(lod, starts), np.diff(np.append(starts, len(lod))))
+
+    return df[lod == last]
+
+
+def level_frame(df, x, y, window=None, budget=LIB_POINT_BUDGET):
+    if df.empty:
+        return df
+
+    lod = df["lod"].to_numpy()
+    bounds = np.searchsorted(lod, np.arange(lod[-1] + 2))
+    xs = df[x].to_numpy(dtype="float64")
+
+    if not budget:
+        return df.iloc[bounds[-2] :]
+
+    # whole curve
+    b0, b1 = bounds[0], bounds[1]
+    if not window:
+        return df.iloc[b0:b1]
+
+    # window, from the coarsest level with at least budget points in it
+    for k in range(len(bounds) - 1):
+        start = bounds[k]
+        i0, i1 = window_slice(xs[start : bounds[k + 1]], window)
+        if i1 - i0 >= budget or k == len(bounds) - 2:
+            break
+
+    i0, i1 = start + i0, start + i1
+    picks = i0 + decimate(xs[i0:i1], df[y].to_numpy(dtype="float64")[i0:i1], budget)
+    if len(picks) == 0:
+        return df.iloc[b0:b1]
+
+    # level 0 outside the window
+    j0 = b0 + np.searchsorted(xs[b0:b1], xs[picks[0]], side="left")
+    j1 = b0 + np.searchsorted(xs[b0:b1], xs[picks[-1]], side="right")
+
+    return df.iloc[np.concatenate([np.arange(b0, j0), picks, np.arange(j1, b1)])]
@@ -13,6 +13,8 @@ import pandas as pd
 
 from config import EXP_PATH
 from datahandle.list import elemtoz
+from datahandle.cache import EXFOR_CACHE
+from file_utils import dir_list, file_open
 
 
 def read_exfor(nuclide, slct_reac, mt, slctd_e):
@@ -23,7 +25,7 @@ def read_exfor(nuclide, slct_reac, mt, slctd_e):
 
     # Data read
     try:
-        exfiles = os.listdir(path)
+        exfiles = dir_list(path)
 
     except:
         exfiles = []
@@ -44,7 +46,7 @@ def read_resid_prod_exfor(nuclide, inc_pt, rp_elem, rp_mass, slctd_e):
     )
 
     try:
-        exfiles = os.listdir(path)
+        exfiles = dir_list(path)
     except:
         exfiles = []
 
@@ -57,6 +59,31 @@ def read_resid_prod_exfor(nuclide, inc_pt, rp_elem, rp_mass, slctd_e):
     return exfiles, rpex_df
 
 
+def read_exfor_file(ef):
+    # one dataset, Energy and XS in eV and barn
+    datasetname = re.split("[-.]", os.path.basename(ef))
+
+    with file_open(ef) as f:
+        exfor_df = pd.read_csv(
+            f,
+            sep="\s+",
+            index_col=None,
+            header=None,
+            usecols=[0, 1, 2, 3],
+            comment="#",
+            names=["Energy", "XS", "dXS", "dE"],
+        )
+    exfor_df["XS"] *= 1e-3
+    exfor_df["dXS"] *= 1e-3
+    exfor_df["Energy"] *= 1e6
+    exfor_df["dE"] *= 1e6
+    exfor_df["author"] = datasetname[3]
+    exfor_df["entry"] = datasetname[4]
+    exfor_df["year"] = datasetname[5]
+
+    return exfor_df
+
+
 def create_exfordf(path, exfiles, slctd_e):
     dfs = []
     for e in exfiles:
@@ -65,27 +92,11 @@ def create_exfordf(path, exfiles, slctd_e):
         if "list" in e:
             continue
         elif datasetname[4] in slctd_e:
-            exfor_df = pd.read_csv(
-                "".join([path, e]),
-                sep="\s+",
-                index_col=None,
-                header=None,
-                usecols=[0, 1, 2, 3],
-                comment="#",
-                names=["Energy", "XS", "dXS", "dE"],
-            )
-            exfor_df["author"] = datasetname[3]
-            exfor_df["entry"] = datasetname[4]
-            exfor_df["year"] = datasetname[5]
-            dfs.append(exfor_df)
+            # cached per dataset, only new selections are read from disk
+            dfs.append(EXFOR_CACHE.get("".join([path, e]), read_exfor_file))
 
     if dfs:
         exfor_df = pd.concat(dfs, ignore_index=True)
-        exfor_df["XS"] *= 1e-3
-        exfor_df["dXS"] *= 1e-3
-        exfor_df["Energy"] *= 1e6
-        exfor_df["dE"] *= 1e6
-
 
     else:
         exfor_df = pd.DataFrame()
@@ -7,38 +7,62 @@
 #
 ####################################################################
 
+import numpy as np
 import pandas as pd
 import re
 import os
-import fnmatch
 
 from config import EXP_PATH_FY
+from datahandle.cache import EXFOR_CACHE
+from file_utils import dir_list, file_open
 
 
 # ------------------------------------------------------------------------------
 # APP4: Fission Yield
 #
 # ------------------------------------------------------------------------------
-# Read EXFOR data
+# Index of the EXFOR files of a directory
 #
+# {(mt, entry, Einc): [file names]} of e.g. exfor/454/, from names such as
+# n-U235-MT454-Wahl-12345003-E2.53E-08.1988 with Einc formatted as in the
+# file names, "{:08.3F}" MeV above 0.1 MeV and "{:8.2E}" below. It is kept
+# in EXFOR_CACHE and rebuilt when the mtime of the directory changes.
 #
-def read_exfy_a(nuclide, inc_pt, mt, ee, nn):
-    path = "".join([EXP_PATH_FY, inc_pt, "/", nuclide, "/exfor/", mt, "/"])
+EXFY_NAME = re.compile(r"-MT(\d{3})(?:-.*)?-([^-]+)-E(\d{4}\.\d{3}|\d\.\d\dE[+-]\d\d)")
+
+
+def list_exfy_dir(path):
+    index = {}
+    for f in sorted(dir_list(path)):
+        m = EXFY_NAME.search(f)
+        if m:
+            index.setdefault(m.groups(), []).append(f)
+
+    return index
+
+
+def einc_format(en):
+    if en > 0.1:
+        return "{:08.3F}".format(en)
+    return "{:8.2E}".format(en)
+
+
+def find_exfy(path, mt, ee, nn):
+    index = EXFOR_CACHE.get(path, list_exfy_dir)
     exfiles = []
     for i in range(len(ee)):
-        e = str(ee[i])
-        en = nn[i] / 1e6
+        exfiles += index.get((mt, str(ee[i]), einc_format(nn[i] / 1e6)), [])
 
-        if en > 0.1:
-            # print (j, ee, '{:08.3F}'.format(en))
-            fmt = "".join(["*-MT", mt, "*", e, "-E", "{:08.3F}".format(en), "*"])
-        else:
-            # print (j, ee, '{:8.2E}'.format(en))
-            fmt = "".join(["*-MT", mt, "*", e, "-E", "{:8.2E}".format(en), "*"])
+    return exfiles
 
-        exname = fnmatch.filter(os.listdir(path), fmt)
-        exfiles += exname
-    #print(path,exfiles)
+
+# ------------------------------------------------------------------------------
+# Read EXFOR data
+#
+#
+def read_exfy_a(nuclide, inc_pt, mt, ee, nn):
+    path = "".join([EXP_PATH_FY, inc_pt, "/", nuclide, "/exfor/", mt, "/"])
+    exfiles = find_exfy(path, mt, ee, nn)
 
     if exfiles:
         exya_df = create_exfy(path, exfiles)  # all included both A==0 and Z ==0
@@ -51,21 +75,7 @@ def read_exfy_a(nuclide, inc_pt, mt, ee, nn):
 
 def read_exfy_za(nuclide, inc_pt, mt, ee, nn):
     path = "".join([EXP_PATH_FY, inc_pt, "/", nuclide, "/exfor/", mt, "/"])
-    exfiles = []
-    for i in range(len(ee)):
-        e = str(ee[i])
-        en = nn[i] / 1e6
-
-        if en > 0.1:
-            # print (j, ee, '{:08.3F}'.format(en))
-            fmt = "".join(["*-MT", mt, "*", e, "-E", "{:08.3F}".format(en), "*"])
-
-        else:
-            # print (j, ee, '{:8.2E}'.format(en))
-            fmt = "".join(["*-MT", mt, "*", e, "-E", "{:8.2E}".format(en), "*"])
-
-        exname = fnmatch.filter(os.listdir(path), fmt)
-        exfiles += exname
+    exfiles = find_exfy(path, mt, ee, nn)
 
     if exfiles:
         exza_df = create_exfy(path, exfiles)  # all included both A==0 and Z ==0
@@ -76,54 +86,78 @@ def read_exfy_za(nuclide, inc_pt, mt, ee, nn):
     return exfiles, exza_df
 
 
+def parse_exfy(ef):
+    # header and data of an EXFORTABLES FY file in one pass:
+    #   # E-inc [MeV]= 2.53E-08 dE-inc [MeV]= 0.0
+    #   # Data points : 25
+    #    40 90 0 5.9615E-03 7.4703E-05
+    # blank lines are ignored, rows which are not Z, A, Iso, FPY, dFPY are
+    # skipped, for the last C5 placeholder row (" 0**** 0 0 0 0") among them
+    # the number of rows read before it is kept as "placeholder"
+    header = {"Einc": None, "dEinc": None, "points": None, "placeholder": None}
+    rows = []
+
+    with file_open(ef) as f:
+        for line in f:
+            if line.startswith("#"):
+                line = line.split()
+                if "E-inc" in line:
+                    header["Einc"], header["dEinc"] = float(line[3]), float(line[6])
+                elif "points" in line:
+                    try:
+                        header["points"] = int(line[-1])
+                    except ValueError:  # e.g. "# Data points :" without number
+                        pass
+                continue
+
+            if not line.strip():
+                continue
+
+            try:
+                z, a, iso, fpy, dfpy = line.split()
+                rows.append((int(z), int(a), int(iso), float(fpy), float(dfpy)))
+            except ValueError:
+                if "****" in line:
+                    header["placeholder"] = len(rows)
+                continue
+
+    data = np.array(rows, dtype="float64").reshape(-1, 5)
+
+    return (
+        header,
+        {
+            "Z": data[:, 0].astype("int64"),
+            "A": data[:, 1].astype("int64"),
+            "Iso": data[:, 2].astype("int64"),
+            "FPY": data[:, 3],
+            "dFPY": data[:, 4],
+        },
+    )
+
+
+def read_exfy_file(ef):
+    # one dataset with typed columns, Einc in eV
+    datasetname = re.split("[-]", os.path.basename(ef), 5)
+    header, data = parse_exfy(ef)
+
+    exfy_df = pd.DataFrame(data)
+    exfy_df["Einc"] = header["Einc"] * 1e6
+    exfy_df["dEinc"] = header["dEinc"] * 1e6
+    exfy_df["author"] = datasetname[3]
+    exfy_df["entry"] = datasetname[4]
+    exfy_df["year"] = re.split("[.]", datasetname[-1])[-1]
+
+    return exfy_df
+
+
 def create_exfy(path, exfiles):
     dfs = []
     for e in exfiles:
-        datasetname = re.split("[-]", e, 5)
-
-        ef = "".join([path, e])
-        # if "list" in e:
-        #     continue
-        # else:
-        with open(ef, "r") as f:
-            for line in f.readlines():
-                if "# E-inc" in line:
-                    line = line.split()
-                    Einc, dEinc = line[3], line[6]
-
-        exfy_df = pd.read_csv(
-            ef,
-            sep="\s+",
-            index_col=None,
-            header=None,
-            comment="#",
-            names=["Z", "A", "Iso", "FPY", "dFPY"],
-        )
-
-        exfy_df = exfy_df[exfy_df["Z"] != "0****"]  # to drop error file from C5
-        exfy_df["Einc"] = Einc
-        exfy_df["dEinc"] = dEinc
-        exfy_df["author"] = datasetname[3]
-        exfy_df["entry"] = datasetname[4]
-        exfy_df["year"] = re.split("[.]", datasetname[-1])[-1]
-        dfs.append(exfy_df)
+        # cached per dataset, only new selections are read from disk
+        dfs.append(EXFOR_CACHE.get("".join([path, e]), read_exfy_file))
 
     if dfs:
         exfy_df = pd.concat(dfs, ignore_index=True)
-        exfy_df = exfy_df.astype(
-            {
-                "Z": "int",
-                "A": "int",
-                "Iso": "int",
-                "FPY": "float64",
-                "dFPY": "float64",
-                "Einc": "float64",
-                "dEinc": "float64",
-            }
-        )  # , errors='ignore'
-        exfy_df["Einc"] *= 1e6
-        exfy_df["dEinc"] *= 1e6
-
 
     else:
         exfy_df = pd.DataFrame()
@@ -7,7 +7,92 @@
 #
 ####################################################################
 
+import re
+from functools import lru_cache
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
+
+from config import FIGURE_VALIDATE
+from datahandle.downsample import decimate_frame
+from datahandle.list import color_libs
+
+# ------------------------------------------------------------------------------
+# Figures as plain dicts
+#
+# Figures are assembled as {"data": [...], "layout": {...}} without plotly's
+# graph objects and their property validation. Layouts are cached, a figure
+# gets a shallow copy, so nested layout parts are shared and must not be
+# modified. Set FIGURE_VALIDATE = True to check every figure with go.Figure.
+#
+# An x array used by more than one trace (e.g. the groupwise energy grid, or
+# the band of a library curve) is sent once in layout.meta.x and referenced
+# as "@x<i>" by the traces, see assets/clientside.js.
+#
+@lru_cache(maxsize=None)
+def plotly_template():
+    return pio.templates[pio.templates.default].to_plotly_json()
+
+
+def new_figure(layout):
+    return {"data": [], "layout": dict(layout)}
+
+
+def no_data_figure():
+    return new_figure(
+        {
+            "title": {"text": "No data found", "font": {"color": "orange"}},
+            "xaxis": {"anchor": "y", "domain": [0.0, 1.0]},
+            "yaxis": {"anchor": "x", "domain": [0.0, 1.0]},
+            "legend": {"tracegroupgap": 0},
+            "template": plotly_template(),
+        }
+    )
+
+
+def share_x(fig):
+    same = {}
+    for trace in fig["data"]:
+        x = trace.get("x")
+        if isinstance(x, np.ndarray) and len(x) > 1:
+            same.setdefault((x.dtype.str, x.tobytes()), []).append(trace)
+
+    xs = []
+    for traces in same.values():
+        if len(traces) > 1:
+            ref = "@x" + str(len(xs))
+            xs.append(traces[0]["x"])
+            for trace in traces:
+                trace["x"] = ref
+
+    if xs:
+        fig["layout"]["meta"] = dict(fig["layout"].get("meta", {}), x=xs)
+
+    return fig
+
+
+def expand_x(fig):
+    xs = fig["layout"].get("meta", {}).get("x")
+    if not xs:
+        return fig
+
+    data = []
+    for trace in fig["data"]:
+        x = trace.get("x")
+        if isinstance(x, str) and x.startswith("@x"):
+            trace = dict(trace, x=xs[int(x[2:])])
+        data.append(trace)
+
+    return dict(fig, data=data)
+
+
+def check_figure(fig):
+    # every figure callback returns through here
+    fig = share_x(fig)
+    if FIGURE_VALIDATE:
+        go.Figure(expand_x(fig))
+    return fig
 
 
 def default_axis(mt):
@@ -34,7 +119,7 @@ def default_axis(mt):
     return xaxis_type, yaxis_type
 
 
-def default_chart(xaxis_type, yaxis_type, reaction, mt):
+def chart_class(reaction, mt):
     reaction = reaction.split(",")
     if (
         mt
@@ -56,101 +141,163 @@ def default_chart(xaxis_type, yaxis_type, reaction, mt):
         and reaction[0] == "n"
     ):
         #  and not nuclide.endswith("000")
-        fig = go.Figure(
-            layout=go.Layout(
-                xaxis={
-                    "title": "Incident energy [eV]",
-                    "type": "log" if xaxis_type == "Log" else "linear",
-                    "rangeslider": {
-                        "bgcolor": "White",
-                        "autorange": True,
-                        "thickness": 0.15,
-                    },
-                },
-                yaxis={
-                    "title": "Cross section [barn]",
-                    "type": "log" if yaxis_type == "Log" else "linear",
-                    "fixedrange": False,
-                },
-                margin={"l": 40, "b": 40, "t": 30, "r": 0},
-            )
-        )
+        return "wide"
 
     elif mt in ["051", "052", "053"] and reaction[0] == "n":
-        #  and not nuclide.endswith("000")
-        fig = go.Figure(
-            layout=go.Layout(
-                xaxis={
-                    "title": "Incident energy [eV]",
-                    "type": "log" if xaxis_type == "Log" else "linear",
-                    "range": [50000, 5000000] if xaxis_type == "Linear" else [5.0, 6.5],
-                    "rangeslider": {
-                        "bgcolor": "White",
-                        "autorange": True,
-                        "thickness": 0.15,
-                    },
-                },
-                yaxis={
-                    "title": "Cross section [barn]",
-                    "type": "log" if yaxis_type == "Log" else "linear",
-                    "fixedrange": False,
-                },
-                margin={"l": 40, "b": 40, "t": 30, "r": 0},
-            )
-        )
-
-    elif mt in ["016", "017", "037"] and reaction[0] == "n":
-        #  and not nuclide.endswith("000")
-        fig = go.Figure(
-            layout=go.Layout(
-                xaxis={
-                    "title": "Incident energy [eV]",
-                    "type": "log" if xaxis_type == "Log" else "linear",
-                    "range": [1000000, 50000000]
-                    if xaxis_type == "Linear"
-                    else [6.1, 7.5],
-                    "rangeslider": {
-                        "bgcolor": "White",
-                        "autorange": True,
-                        "thickness": 0.15,
-                    },
-                },
-                yaxis={
-                    "title": "Cross section [barn]",
-                    "type": "log" if yaxis_type == "Log" else "linear",
-                    "fixedrange": False,
-                },
-                margin={"l": 40, "b": 40, "t": 30, "r": 0},
-            )
-        )
+        return "inelastic"
 
     else:
-        fig = go.Figure(
-            layout=go.Layout(
-                # template="plotly_white",
-                xaxis={
-                    "title": "Incident energy [eV]",
-                    "type": "linear" if xaxis_type == "Linear" else "log",
-                    "range": [1000000, 50000000]
-                    if xaxis_type == "Linear"
-                    else [6.1, 7.5],
-                    "rangeslider": {
-                        "bgcolor": "White",
-                        "autorange": True,
-                        "thickness": 0.15,
-                    },
-                },
-                yaxis={
-                    "title": "Cross section [barn]",
-                    "type": "linear" if yaxis_type == "Linear" else "log",
-                    "fixedrange": False,
-                },
-                margin={"l": 40, "b": 40, "t": 30, "r": 0},
+        # "016", "017", "037" and others
+        return "threshold"
+
+
+# x ranges of each chart class, {xaxis_type: range}
+XRANGES = {
+    "wide": None,
+    "inelastic": {"Linear": [50000, 5000000], "Log": [5.0, 6.5]},
+    "threshold": {"Linear": [1000000, 50000000], "Log": [6.1, 7.5]},
+}
+
+
+@lru_cache(maxsize=None)
+def chart_layout(cls, xaxis_type, yaxis_type):
+    # x ranges depending on xaxis_type are also kept in layout.meta for the
+    # clientside Linear/Log switch (assets/clientside.js)
+    layout = {
+        "xaxis": {
+            "title": {"text": "Incident energy [eV]"},
+            "type": "log" if xaxis_type == "Log" else "linear",
+            "rangeslider": {
+                "bgcolor": "White",
+                "autorange": True,
+                "thickness": 0.15,
+            },
+            "exponentformat": "power",
+        },
+        "yaxis": {
+            "title": {"text": "Cross section [barn]"},
+            "type": "log" if yaxis_type == "Log" else "linear",
+            "fixedrange": False,
+            "exponentformat": "power",
+        },
+        "margin": {"l": 40, "b": 40, "t": 30, "r": 0},
+        "template": plotly_template(),
+    }
+
+    xrange = XRANGES[cls]
+    if xrange:
+        layout["xaxis"]["range"] = xrange["Log" if xaxis_type == "Log" else "Linear"]
+        layout["meta"] = {"xrange": xrange}
+
+    return layout
+
+
+def default_chart(xaxis_type, yaxis_type, reaction, mt):
+    return new_figure(chart_layout(chart_class(reaction, mt), xaxis_type, yaxis_type))
+
+
+@lru_cache(maxsize=None)
+def fy_layout(xtitle, dtick, yaxis_type):
+    return {
+        "xaxis": {"title": {"text": xtitle}, "type": "linear", "dtick": dtick},
+        "yaxis": {
+            "title": {"text": "Fission yields [/fission]"},
+            "type": "log" if yaxis_type == "Log" else "linear",
+            "exponentformat": "power",
+        },
+        "margin": {"l": 40, "b": 40, "t": 30, "r": 0},
+        "template": plotly_template(),
+    }
+
+
+# ------------------------------------------------------------------------------
+# Traces
+#
+# Rows are grouped once by factorized keys and a stable argsort, each group is
+# then a slice of the sorted frame. Groups come in order of first appearance,
+# nested by keys, as the former loops over unique() values.
+#
+def group_slices(df, keys):
+    # [(values, sub frame), ...]
+    if df.empty:
+        return []
+
+    codes = []
+    for n in range(1, len(keys) + 1):
+        if n == 1:
+            c, _ = pd.factorize(df[keys[0]], use_na_sentinel=False)
+        else:
+            c, _ = pd.factorize(
+                pd.MultiIndex.from_frame(df[keys[:n]]), use_na_sentinel=False
             )
-        )
+        codes.append(c)
 
-    # Expornential format
-    fig.update_xaxes(exponentformat="power")
-    fig.update_yaxes(exponentformat="power")
+    order = np.lexsort(codes[::-1])
+    last = codes[-1][order]
+    bounds = np.flatnonzero(np.diff(last)) + 1
+    bounds = np.concatenate([[0], bounds, [len(order)]])
 
-    return fig
+    df = df.iloc[order]
+    groups = []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        group = df.iloc[start:stop]
+        groups.append((tuple(group[k].iloc[0] for k in keys), group))
+
+    return groups
+
+
+def label_year(df):
+    label = str(df["author"].unique()) + "," + str(df["year"].unique())
+    return re.sub("\[|\]|'", "", label)
+
+
+def label_einc(df):
+    label = str(df["author"].unique() + "," + "{:.2e}".format(df["Einc"].iloc[0]))
+    return re.sub("\[|\]|'", "", label)
+
+
+def error_bar(df, col):
+    return {"type": "data", "array": df[col].to_numpy()}
+
+
+def lib_traces(lib_dff, x, y, dy=None, window=None):
+    traces = []
+    for (l,), df in group_slices(lib_dff, ["lib"]):
+        df = decimate_frame(df, x, y, window)
+        line_color = color_libs(l)
+        new_col = next(line_color)
+        trace = {
+            "type": "scatter",
+            "x": df[x].to_numpy(),
+            "y": df[y].to_numpy(),
+            "showlegend": True,
+            "line": {"color": new_col},
+            "name": l,
+            "mode": "lines",
+        }
+        if dy:
+            trace["error_y"] = error_bar(df, dy)
+        traces.append(trace)
+
+    return traces
+
+
+def exfor_traces(exfor_dff, keys, x, y, label, dx=None, dy=None, size=8):
+    traces = []
+    for i, (_, df) in enumerate(group_slices(exfor_dff, keys)):
+        trace = {
+            "type": "scatter",
+            "x": df[x].to_numpy(),
+            "y": df[y].to_numpy(),
+            "showlegend": True,
+            "name": label(df),
+            "marker": {"size": size, "symbol": i},
+            "mode": "markers",
+        }
+        if dx:
+            trace["error_x"] = error_bar(df, dx)
+        if dy:
+            trace["error_y"] = error_bar(df, dy)
+        traces.append(trace)
+
+    return traces
@@ -16,6 +16,7 @@ from dash_extensions.snippets import send_bytes
 from urllib.parse import quote as urlquote
 
 from config import EXP_PATH, DATA_ROOT_FOLDER
+from file_utils import file_bytes
 
 
 def list_libfiles(libfiles):
@@ -167,6 +168,6 @@ def genzip(exfiles, slctd_tab):
                         ]
                     )
 
-                zf.write(fullpath, arcname="".join(["exfortables/", ef]))
+                zf.writestr("".join(["exfortables/", ef]), file_bytes(fullpath))
 
     return send_bytes(write_archive, "exfortables.zip")
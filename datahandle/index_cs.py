@@ -8,14 +8,21 @@
 ####################################################################
 
 import pandas as pd
-import os
 
 from config import EXP_PATH
 from datahandle.list import elemtoz
+from datahandle.index_db import parse_list_cs, query_index
+from datahandle.makelist import invalidate_caches
+from file_utils import path_exists
 
 
 def read_index(nuclide, slct_reac, mt):
     reac = slct_reac.split(",")
+    invalidate_caches("cs")
+
+    index_df = query_index("xs", reac[0], nuclide, mt)
+    if index_df is not None:
+        return index_df
 
     # file path
     listfile = "".join(
@@ -43,6 +50,11 @@ def read_index(nuclide, slct_reac, mt):
 
 def read_index_rp(nuclide, inc_pt, rp_elem, rp_mass):
     rp_z = elemtoz(rp_elem)
+    invalidate_caches("cs")
+
+    index_df = query_index("rp", inc_pt, nuclide, rp_z + rp_mass)
+    if index_df is not None:
+        return index_df
 
     # file path
     listfile = "".join(
@@ -85,24 +97,9 @@ def create_indexdf(listfile):
     ]
     index_df = pd.DataFrame(columns=cols)
 
-    if os.path.exists(listfile):
-        index_df = pd.read_csv(
-            listfile,
-            sep="\s+",
-            index_col=None,
-            header=None,
-            usecols=[0, 1, 2, 3],
-            comment="#",
-            names=["filename", "points", "emin", "emax"],
-        )
-        index_df[["inc", "target", "mt", "author", "entry", "year"]] = index_df[
-            "filename"
-        ].str.split("[-.]", expand=True)
-        index_df = index_df.astype(
-            {"emin": "float64", "emax": "float64", "points": "int"}, errors="ignore"
-        )
+    if path_exists(listfile):
+        index_df = parse_list_cs(listfile)
         index_df = index_df[["author", "entry", "year", "points", "emin", "emax"]]
-        index_df[["emin", "emax"]] *= 1e6
         index_df = index_df.sort_values(by=["year"], ascending=False).reset_index(
             drop=True
         )
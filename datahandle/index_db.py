@@ -0,0 +1,254 @@
+####################################################################
+#
+# This file is part of libraries-2021 dataexplorer, https://nds.iaea.org/dataexplorer/.
+# Copyright (C) 2022 International Atomic Energy Agency (IAEA)
+#
+# Contact:    nds.contact-point@iaea.org
+#
+####################################################################
+
+import os
+import sqlite3
+import threading
+import pandas as pd
+
+from config import EXP_PATH, EXP_PATH_FY, EXFOR_INDEX_DB
+from file_utils import path_exists, file_glob, file_open
+
+# ------------------------------------------------------------------------------
+# EXFOR dataset index
+#
+# All .list files of EXFORTABLES in one SQLite table. kind is "xs", "rp"
+# (residual), "ya" (FY -YA.list) or "za" (FY .list), code is the MT number
+# or the residual (e.g. "043099m"). Energies are stored in eV.
+# Run "python -m datahandle.index_db" to (re)build the database.
+#
+SCHEMA = """
+CREATE TABLE exfor_index (
+    kind TEXT NOT NULL,
+    inc TEXT NOT NULL,
+    target TEXT NOT NULL,
+    code TEXT NOT NULL,
+    listfile TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    author TEXT,
+    entry TEXT,
+    year TEXT,
+    points INTEGER,
+    emin REAL,
+    emax REAL,
+    einc REAL,
+    de REAL
+);
+CREATE INDEX exfor_index_reac ON exfor_index (kind, inc, target, code, einc);
+CREATE INDEX exfor_index_list ON exfor_index (listfile);
+"""
+
+COLS = [
+    "kind",
+    "inc",
+    "target",
+    "code",
+    "listfile",
+    "filename",
+    "author",
+    "entry",
+    "year",
+    "points",
+    "emin",
+    "emax",
+    "einc",
+    "de",
+]
+
+_local = threading.local()
+
+
+# ------------------------------------------------------------------------------
+# .list file parser
+#
+def parse_list_cs(listfile):
+    with file_open(listfile) as f:
+        index_df = pd.read_csv(
+            f,
+            sep="\s+",
+            index_col=None,
+            header=None,
+            usecols=[0, 1, 2, 3],
+            comment="#",
+            names=["filename", "points", "emin", "emax"],
+        )
+    index_df[["inc", "target", "mt", "author", "entry", "year"]] = index_df[
+        "filename"
+    ].str.split("[-.]", expand=True)
+    index_df = index_df.astype(
+        {"emin": "float64", "emax": "float64", "points": "int"}, errors="ignore"
+    )
+    index_df[["emin", "emax"]] *= 1e6
+
+    return index_df
+
+
+def parse_list_fy(listfile):
+    with file_open(listfile) as f:
+        index_df = pd.read_csv(
+            f,
+            sep="\s+",
+            index_col=None,
+            header=None,
+            usecols=[0, 1, 2, 3],
+            comment="#",
+            names=["filename", "points", "einc", "de"],
+        )
+    index_df[["inc", "target", "mt", "author", "entry", "tmp"]] = index_df[
+        "filename"
+    ].str.split("[-]", n=5, expand=True)
+    index_df["year"] = index_df["tmp"].str[10:14]
+    index_df = index_df.astype(
+        {"entry": "object", "einc": "float64", "de": "float64", "points": "int"}
+    )
+    index_df["einc"] *= 1e6
+    index_df["de"] *= 1e6
+
+    return index_df
+
+
+# ------------------------------------------------------------------------------
+# Ingestion
+#
+def find_lists():
+    # (kind, listfile) of all .list files in EXFORTABLES
+    lists = []
+    for listfile in sorted(file_glob(EXP_PATH + "*/*/exfor/xs/*/*.list")):
+        lists.append(("xs", listfile))
+
+    for listfile in sorted(file_glob(EXP_PATH + "*/*/exfor/residual/*/*.list")):
+        lists.append(("rp", listfile))
+
+    for listfile in sorted(file_glob(EXP_PATH_FY + "*/*/exfor/*/*.list")):
+        lists.append(("ya" if listfile.endswith("-YA.list") else "za", listfile))
+
+    return lists
+
+
+def list_rows(kind, listfile):
+    parts = listfile.split("/")
+
+    if kind in ["xs", "rp"]:
+        # <inc>/<target>/exfor/<xs|residual>/<code>/<listfile>
+        inc, target, code = parts[-6], parts[-5], parts[-2]
+        index_df = parse_list_cs(listfile)
+        index_df["einc"] = None
+        index_df["de"] = None
+    else:
+        # <inc>/<target>/exfor/<code>/<listfile>
+        inc, target, code = parts[-5], parts[-4], parts[-2]
+        index_df = parse_list_fy(listfile)
+        index_df["emin"] = None
+        index_df["emax"] = None
+
+    index_df["kind"] = kind
+    index_df["inc"] = inc
+    index_df["target"] = target
+    index_df["code"] = code
+    index_df["listfile"] = listfile
+    index_df = index_df[COLS].astype(object)
+
+    return index_df.where(index_df.notna(), None)
+
+
+def ingest_list(conn, kind, listfile):
+    conn.execute("DELETE FROM exfor_index WHERE listfile = ?", (listfile,))
+
+    if path_exists(listfile):
+        rows = list_rows(kind, listfile).itertuples(index=False, name=None)
+        conn.executemany(
+            "INSERT INTO exfor_index VALUES ({})".format(",".join("?" * len(COLS))),
+            rows,
+        )
+
+
+def build_index_db():
+    tmp = EXFOR_INDEX_DB + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    conn = sqlite3.connect(tmp)
+    conn.executescript(SCHEMA)
+    lists = find_lists()
+    for kind, listfile in lists:
+        try:
+            ingest_list(conn, kind, listfile)
+        except Exception as e:
+            print("skip", listfile, e)
+    conn.commit()
+    conn.close()
+
+    os.replace(tmp, EXFOR_INDEX_DB)
+
+    return len(lists)
+
+
+# ------------------------------------------------------------------------------
+# Query
+#
+def connect():
+    # one read-only connection per thread, reopened when the db is replaced
+    mtime = os.stat(EXFOR_INDEX_DB).st_mtime
+    conn = getattr(_local, "conn", None)
+
+    if conn is None or _local.mtime != mtime:
+        if conn is not None:
+            conn.close()
+        conn = sqlite3.connect(
+            "".join(["file:", EXFOR_INDEX_DB, "?mode=ro"]),
+            uri=True,
+            check_same_thread=False,
+        )
+        _local.conn, _local.mtime = conn, mtime
+
+    return conn
+
+
+def query_index(kind, inc, target, code, min_einc=None, max_einc=None):
+    # returns None if there is no database, the caller then reads the .list file
+    if not os.path.exists(EXFOR_INDEX_DB):
+        return None
+
+    if kind in ["xs", "rp"]:
+        sql = """
+            SELECT author, entry, year, points, emin, emax FROM exfor_index
+            WHERE kind = ? AND inc = ? AND target = ? AND code = ?
+            ORDER BY year DESC, rowid
+        """
+        params = (kind, inc, target, code)
+
+    else:
+        sql = """
+            SELECT author, entry, year, points, einc, de FROM exfor_index
+            WHERE kind = ? AND inc = ? AND target = ? AND code = ?
+            AND einc > ? AND einc < ?
+            ORDER BY einc, year, rowid
+        """
+        params = (kind, inc, target, code, min_einc, max_einc)
+
+    # no rows gives the columns of the .list file reader without rows
+    return pd.read_sql_query(sql, connect(), params=params)
+
+
+def count_index(kind):
+    # {(inc, target, code): number of datasets}, None if there is no database
+    if not os.path.exists(EXFOR_INDEX_DB):
+        return None
+
+    sql = """
+        SELECT inc, target, code, COUNT(*) FROM exfor_index
+        WHERE kind = ? GROUP BY inc, target, code
+    """
+
+    return {row[:3]: row[3] for row in connect().execute(sql, (kind,))}
+
+
+if __name__ == "__main__":
+    n = build_index_db()
+    print(n, ".list files in", EXFOR_INDEX_DB)
@@ -9,13 +9,13 @@
 
 import pandas as pd
 import numpy as np
-import os
 
 # import glob
 
 from config import EXP_PATH_FY
-
-# from file_utils import path_exists
+from datahandle.index_db import parse_list_fy, query_index
+from datahandle.makelist import invalidate_caches
+from file_utils import path_exists
 
 
 def energy_range(energy):
@@ -41,6 +41,13 @@ def energy_range(energy):
 
 def read_index_fy(nuclide, slct_reac, mt, min_einc, max_einc):
     reac = slct_reac.split(",")
+    invalidate_caches("fy")
+
+    # energy window is applied in the query
+    index_a_df = query_index("ya", reac[0], nuclide, mt, min_einc, max_einc)
+    index_za_df = query_index("za", reac[0], nuclide, mt, min_einc, max_einc)
+    if index_a_df is not None:
+        return index_a_df, index_za_df
 
     listfile_a = "".join(
         [
@@ -98,26 +105,9 @@ def create_indexdf(listfile, min_einc, max_einc):
     ]
     index_df = pd.DataFrame(columns=cols)
 
-    if os.path.exists(listfile):
-        index_df = pd.read_csv(
-            listfile,
-            sep="\s+",
-            index_col=None,
-            header=None,
-            usecols=[0, 1, 2, 3],
-            comment="#",
-            names=["filename", "points", "einc", "de"],
-        )
-        index_df[["inc", "target", "mt", "author", "entry", "tmp"]] = index_df[
-            "filename"
-        ].str.split("[-]", n=5, expand=True)
-        index_df["year"] = index_df["tmp"].str[10:14]
-        index_df = index_df.astype(
-            {"entry": "object", "einc": "float64", "de": "float64", "points": "int"}
-        )
+    if path_exists(listfile):
+        index_df = parse_list_fy(listfile)
         index_df = index_df[["author", "entry", "year", "points", "einc", "de"]]
-        index_df["einc"] *= 1e6
-        index_df["de"] *= 1e6
         index_df = index_df.sort_values(by=["einc", "year"], ascending=True)
 
         index_df = index_df[
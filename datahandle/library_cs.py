@@ -9,10 +9,11 @@
 
 import pandas as pd
 import numpy as np
-import os
 
-from config import LIB_PATH
 from datahandle.list import elemtoz, LIB_LIST_MIN, LIB_LIST_RP, ISOMERIC
+from datahandle.catalog import find_lib
+from datahandle.libstore import read_levels, table_df
+from datahandle.cache import LIB_CACHE
 
 # ------------------------------------------------------------------------------
 # APP2: Libraries
@@ -23,31 +24,23 @@ def read_libs(nuclide, slct_reac, mt, groupwise):
     liblist = []
     libfiles = []
     for lib in lib_list:
-        path = "".join([LIB_PATH, reac[0], "/", nuclide, "/", lib, "/tables/xs/"])
-
-        filename = "".join(
-            [
-                reac[0],
-                "-",
-                nuclide,
-                "-MT",
-                mt,
-                "-G1102."
-                if (
-                    "G" in groupwise
-                    and mt in ["001", "002", "018", "102"]
-                    and not nuclide.endswith("000")
-                    and reac[0] == "n"
-                )
-                else ".",
-                lib,
-                ".txt"
-            ]
+        lfname = find_lib(
+            reac[0],
+            nuclide,
+            lib,
+            "xs",
+            mt,
+            variant="G1102"
+            if (
+                "G" in groupwise
+                and mt in ["001", "002", "018", "102"]
+                and not nuclide.endswith("000")
+                and reac[0] == "n"
+            )
+            else "",
         )
 
-        lfname = "".join([path, filename])
-
-        if os.path.exists(lfname):
+        if lfname:
             # Library file name list for download
             liblist.append([lfname, lib])
 
@@ -70,10 +63,12 @@ def read_resid_prod_lib(nuclide, inc_pt, rp_elem, rp_mass):
     liblist = []
     libfiles = []
     for lib in lib_list:
-        path = "".join([LIB_PATH, inc_pt, "/", nuclide, "/", lib, "/tables/residual/"])
-        lfname = "".join([path, inc_pt, "-", nuclide, "-rp", rp_z, rp_mass, ".", lib, ".txt"])
+        # rp_mass is e.g. "099m", the isomeric flag follows the mass number
+        lfname = find_lib(
+            inc_pt, nuclide, lib, "residual", rp_z + rp_mass[:3], rp_mass[3:]
+        )
 
-        if os.path.exists(lfname):
+        if lfname:
             # Library file name list for download
             liblist.append([lfname, lib])
 
@@ -85,6 +80,15 @@ def read_resid_prod_lib(nuclide, inc_pt, rp_elem, rp_mass):
     return libfiles, lib_df
 
 
+def level_df(levels, names):
+    # all levels of detail of a table, see datahandle/downsample.py
+    arr, bounds = levels
+    lib_df = table_df(arr, names)
+    lib_df["lod"] = np.repeat(np.arange(len(bounds) - 1), np.diff(bounds))
+
+    return lib_df
+
+
 def create_libdf(libfiles):
     dfs = []
     for i in range(0, len(libfiles)):
@@ -92,15 +96,8 @@ def create_libdf(libfiles):
         lib = libfiles[i][1]
 
         try:  # due to null file such as g + S  33 : (g,a)
-            lib_df = pd.read_csv(
-                l,
-                sep="\s+",
-                index_col=None,
-                header=None,
-                usecols=[0, 1],
-                comment="#",
-                names=["Energy", "XS"],
-            )
+            # Energy and XS are already in eV and barn
+            lib_df = level_df(LIB_CACHE.get(l, read_levels), ["Energy", "XS"])
             lib_df["lib"] = lib
             dfs.append(lib_df)
 
@@ -112,8 +109,6 @@ def create_libdf(libfiles):
 
     if dfs:
         lib_df = pd.concat(dfs, ignore_index=True)
-        lib_df["XS"] *= 1e-3
-        lib_df["Energy"] *= 1e6
 
     else:
         lib_df = pd.DataFrame()
@@ -134,34 +129,23 @@ def read_libs_lib(nuclide, slct_mt_df, slct_lib, groupwise):
         reac = reac.split(",")
         for lib in slct_lib:
             for iso in ISOMERIC:
-                lfname = "".join(
-                    [
-                        LIB_PATH,
-                        reac[0],
-                        "/",
-                        nuclide,
-                        "/",
-                        lib,
-                        "/tables/xs/",
-                        reac[0],
-                        "-",
-                        nuclide,
-                        "-MT",
-                        mt,
-                        iso,
-                        "-G1102."
-                        if (
-                            "G" in groupwise
-                            and mt in ["001", "002", "018", "102"]
-                            and not nuclide.endswith("000")
-                            and reac[0] == "n"
-                        )
-                        else ".",
-                        lib,
-                        ".txt"
-                    ]
+                lfname = find_lib(
+                    reac[0],
+                    nuclide,
+                    lib,
+                    "xs",
+                    mt,
+                    iso,
+                    "G1102"
+                    if (
+                        "G" in groupwise
+                        and mt in ["001", "002", "018", "102"]
+                        and not nuclide.endswith("000")
+                        and reac[0] == "n"
+                    )
+                    else "",
                 )
-                if os.path.exists(lfname):
+                if lfname:
                     liblist.append([mt, lib, lfname, iso])
 
     lib_df2 = create_libdf_lobs(liblist)
@@ -180,14 +164,10 @@ def create_libdf_lobs(libfiles):
         iso = libfiles[i][3]
 
         try:  # due to null file such as g + S  33 : (g,a)
-            lib_df2 = pd.read_csv(
-                libfiles[i][2],
-                sep="\s+",
-                index_col=None,
-                header=None,
-                # usecols=[0, 1, 2, 3],
-                comment="#",
-                names=["Energy", "XS", "xslow", "xsupp"],
+            # Energy and XS are already in eV and barn
+            lib_df2 = level_df(
+                LIB_CACHE.get(libfiles[i][2], read_levels),
+                ["Energy", "XS", "xslow", "xsupp"],
             )
 
             lib_df2["lib"] = l
@@ -217,10 +197,6 @@ def create_libdf_lobs(libfiles):
 
     if dfs2:
         lib_df2 = pd.concat(dfs2, ignore_index=True)
-        lib_df2["XS"] *= 1e-3
-        lib_df2["xslow"] *= 1e-3
-        lib_df2["xsupp"] *= 1e-3
-        lib_df2["Energy"] *= 1e6
 
     else:
         lib_df2 = pd.DataFrame()
@@ -7,16 +7,25 @@
 #
 ####################################################################
 
+import numpy as np
 import pandas as pd
-import os
 
-from datahandle.list import LIB_LIST_FY
-from config import LIB_PATH_FY
+from config import LIB_PATH_FY, LIB_STORE_PATH
+from datahandle.list import LIB_LIST_FY, MT_LIST_FY, PARTICLE_FY
+from datahandle.catalog import find_lib, find_store, parse_libname, invalidate_catalog
+from datahandle.cache import LIB_CACHE
+from datahandle.libstore import write_store
+from file_utils import is_dir, dir_list, file_open
 
 # ------------------------------------------------------------------------------
 # APP4: Fission Yield
 #
-def read_libfy(nuclide, inc_pt, mt, energy, fy_type):
+# Only the products of a yield table used by the graphs are read: Y(A), and
+# Y(Z,A) of the ground states as a dense Z x A matrix. Y(Z,A) is passed on
+# with one row per (lib, Z) and one column per A ("<A>" for FPY, "d<A>" for
+# dFPY), so that selecting a mass is a column slice (za_slice).
+#
+def read_libfy(nuclide, inc_pt, mt, energy):
     lib_list = LIB_LIST_FY
 
     if energy == "eV":
@@ -30,83 +39,225 @@ def read_libfy(nuclide, inc_pt, mt, energy, fy_type):
 
     liblist = []
     libfiles = []
-    dfs = []
+    yas = []
+    zas = []
     for lib in lib_list:
         if lib == "jeff3.3" and energy == "keV":
             en = "0000.400"
         elif energy == "keV":
             en = "0000.500"
 
-        lfname = "".join(
-            [
-                LIB_PATH_FY,
-                inc_pt,
-                "/",
-                nuclide,
-                "/",
-                lib,
-                "/tables/FY/",
-                inc_pt,
-                "-",
-                nuclide,
-                "-MT",
-                mt,
-                "-E",
-                en,
-                ".",
-                lib,
-                ".txt"
-            ]
-        )
-
-        if os.path.exists(lfname):
+        lfname = find_lib(inc_pt, nuclide, lib, "FY", mt, variant=en)
+
+        if lfname:
             # Library file name list for download
             liblist.append([lfname, lib])
 
-            libfy_df = pd.read_csv(
-                lfname,
-                sep="\s+",
-                index_col=None,
-                header=None,
-                comment="#",
-                names=["Z", "A", "M", "FPY", "dFPY"],
-            )
-            libfy_df["lib"] = lib
-            dfs.append(libfy_df)
+            products = LIB_CACHE.get(lfname, read_fyproducts)
+            yas.append(ya_df(products, lib))
+            zas.append(za_df(products, lib))
 
-    if dfs:
-        libfy_df = pd.concat(dfs, ignore_index=True)
-
-        # create Y(A) table
-        libya_df = create_libYA(libfy_df, fy_type)
+    if yas:
+        libya_df = pd.concat(yas, ignore_index=True)
+        libza_df = pd.concat(zas, ignore_index=True)
 
     else:
-        libfy_df = pd.DataFrame()
         libya_df = pd.DataFrame()
+        libza_df = pd.DataFrame()
 
     if liblist:
         libfiles = [i[0] for i in liblist]
 
-    return libfiles, libya_df, libfy_df
+    return libfiles, libya_df, libza_df
+
+
+def read_fytable(lfname):
+    with file_open(lfname) as f:
+        return pd.read_csv(
+            f,
+            sep="\s+",
+            index_col=None,
+            header=None,
+            comment="#",
+            names=["Z", "A", "M", "FPY", "dFPY"],
+        ).to_numpy(dtype="float64")
 
 
 def create_libYA(libfy_df, fytype):
-    aa = []
+    # Y(A) of each library for every A from the lightest to the heaviest
+    # product, A without yield is NaN for Cumulative (max) and 0 otherwise (sum)
     lib = libfy_df["lib"].unique()
-    for l in lib:
-        for a in range(60, 180):
-
-            if fytype == "Independent":
-                ay = libfy_df[(libfy_df["A"] == a) & (libfy_df["lib"] == l)][
-                    "FPY"
-                ].sum()
-            if fytype == "Cumulative":
-                ay = libfy_df[(libfy_df["A"] == a) & (libfy_df["lib"] == l)][
-                    "FPY"
-                ].max()
-
-            d = {"A": a, "FPY": ay, "lib": l}
-            aa.append(d)
-        libya_df = pd.DataFrame(aa)
-    # print (libya_df)
+    mass = np.arange(libfy_df["A"].min(), libfy_df["A"].max() + 1)
+    fpy = libfy_df.groupby(["lib", "A"])["FPY"]
+
+    if fytype == "Cumulative":
+        ay = fpy.max()
+        fill = np.nan
+    else:
+        ay = fpy.sum()
+        fill = 0.0
+
+    ay = ay.reindex(pd.MultiIndex.from_product([lib, mass], names=["lib", "A"]))
+    libya_df = ay.fillna(fill).reset_index()
+
+    return libya_df[["A", "FPY", "lib"]]
+
+
+def create_libZA(libfy_df):
+    # [FPY, dFPY] x Z x A of the ground states, NaN if not in the table,
+    # and the Z and A of the first row and column
+    gs = libfy_df[libfy_df["M"] == 0]
+    z = gs["Z"].to_numpy()
+    a = gs["A"].to_numpy()
+    origin = np.array([z.min(), a.min()])
+
+    za = np.full((2, z.max() - origin[0] + 1, a.max() - origin[1] + 1), np.nan)
+    za[0, z - origin[0], a - origin[1]] = gs["FPY"].to_numpy()
+    za[1, z - origin[0], a - origin[1]] = gs["dFPY"].to_numpy()
+
+    return za, origin
+
+
+def fy_products(arr, fytype):
+    libfy_df = pd.DataFrame(arr, columns=["Z", "A", "M", "FPY", "dFPY"])
+    libfy_df = libfy_df.astype({"Z": "int", "A": "int", "M": "int"})
+    libfy_df["lib"] = ""
+
+    if libfy_df.empty:
+        return {
+            "ya": np.empty((0, 2)),
+            "za": np.empty((2, 0, 0)),
+            "origin": np.zeros(2, dtype="int64"),
+        }
+
+    za, origin = create_libZA(libfy_df)
+
+    return {
+        "ya": create_libYA(libfy_df, fytype)[["A", "FPY"]].to_numpy(dtype="float64"),
+        "za": za,
+        "origin": origin,
+    }
+
+
+def ya_df(products, lib):
+    libya_df = pd.DataFrame(products["ya"], columns=["A", "FPY"])
+    libya_df = libya_df.astype({"A": "int"})
+    libya_df["lib"] = lib
+
     return libya_df
+
+
+def za_df(products, lib):
+    za = products["za"]
+    z0, a0 = products["origin"]
+
+    cols = {"lib": lib, "Z": np.arange(z0, z0 + za.shape[1])}
+    for i in range(za.shape[2]):
+        cols[str(a0 + i)] = za[0, :, i]
+    for i in range(za.shape[2]):
+        cols["d" + str(a0 + i)] = za[1, :, i]
+
+    return pd.DataFrame(cols)
+
+
+def za_slice(libza_df, a):
+    # Y(Z) of the ground states of mass a, as (lib, Z, FPY, dFPY)
+    a = str(a)
+    if a not in libza_df:
+        return pd.DataFrame()
+
+    libfy_df = pd.DataFrame(
+        {
+            "lib": libza_df["lib"],
+            "Z": libza_df["Z"],
+            "FPY": libza_df[a],
+            "dFPY": libza_df["d" + a],
+        }
+    )
+
+    return libfy_df[libfy_df["FPY"].notna()]
+
+
+# ------------------------------------------------------------------------------
+# Store of the yield products
+#
+# One NPZ archive per projectile and nuclide (e.g. libstore/FY/n/U235.npz)
+# holds "<table>@ya", "<table>@za" and "<table>@origin" of all FY tables of
+# every library, <table> being the text file name without ".txt".
+# The archives are found through the catalog (datahandle/catalog.py), tables
+# not in the store are read from the text files.
+#
+# Run "python -m datahandle.library_fy" to (re)build the store from LIB_PATH_FY,
+# then "python -m datahandle.catalog" if the catalog snapshot is used.
+#
+def fy_store_path(inc_pt, nuclide):
+    return "".join([LIB_STORE_PATH, "FY/", inc_pt, "/", nuclide, ".npz"])
+
+
+def fy_type_of(lfname):
+    # LIB_PATH_FY/<inc_pt>/<nuclide>/<lib>/tables/FY/<file>.txt
+    parts = lfname[len(LIB_PATH_FY) :].split("/")
+    key = parse_libname(parts[0], parts[1], parts[2], "FY", parts[5])
+
+    return dict((m, t) for t, m in MT_LIST_FY).get(key[0] if key else "")
+
+
+def read_fyproducts_store(lfname):
+    parts = lfname[len(LIB_PATH_FY) :].split("/")
+    store = find_store(parts[0], parts[1], "FY")
+
+    if store:
+        with np.load(store) as npz:
+            key = parts[-1][:-4]
+            if key + "@ya" in npz.files:
+                return {p: npz[key + "@" + p] for p in ["ya", "za", "origin"]}
+
+    return None
+
+
+def read_fyproducts(lfname):
+    products = None
+    if lfname.startswith(LIB_PATH_FY):
+        products = read_fyproducts_store(lfname)
+
+    if products is None:
+        products = fy_products(read_fytable(lfname), fy_type_of(lfname))
+
+    return products
+
+
+def convert_fy():
+    for inc_pt in PARTICLE_FY:
+        path = "".join([LIB_PATH_FY, inc_pt, "/"])
+        if not is_dir(path):
+            continue
+
+        for nuclide in sorted(dir_list(path)):
+            tables = {}
+            for lib in sorted(dir_list(path + nuclide)):
+                tpath = "".join([path, nuclide, "/", lib, "/tables/FY/"])
+                if not is_dir(tpath):
+                    continue
+
+                for f in sorted(dir_list(tpath)):
+                    if not f.endswith(".txt"):
+                        continue
+
+                    try:
+                        products = fy_products(
+                            read_fytable(tpath + f), fy_type_of(tpath + f)
+                        )
+                    except:
+                        continue
+
+                    for p, v in products.items():
+                        tables["".join([f[:-4], "@", p])] = v
+
+            if tables:
+                write_store(fy_store_path(inc_pt, nuclide), tables)
+                invalidate_catalog()
+            print(inc_pt, nuclide, len(tables) // 3, "tables")
+
+
+if __name__ == "__main__":
+    convert_fy()
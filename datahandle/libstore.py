@@ -0,0 +1,229 @@
+####################################################################
+#
+# This file is part of libraries-2021 dataexplorer, https://nds.iaea.org/dataexplorer/.
+# Copyright (C) 2022 International Atomic Energy Agency (IAEA)
+#
+# Contact:    nds.contact-point@iaea.org
+#
+####################################################################
+
+import os
+import numpy as np
+import pandas as pd
+
+from config import LIB_PATH, LIB_STORE_PATH
+from datahandle.list import PARTICLE
+from datahandle.catalog import find_store, invalidate_catalog
+from datahandle.downsample import pyramid
+from file_utils import is_dir, dir_list, file_open
+
+# ------------------------------------------------------------------------------
+# Binary store of ENDFTABLES
+#
+# One NPZ archive per incident particle and nuclide (e.g. libstore/n/Au197.npz)
+# holds all tables/xs/ and tables/residual/ files of every library.
+# Members are named after the text file without ".txt" and are stored
+# already converted to eV and barn (Energy, XS[, xslow, xsupp]).
+# The levels of detail of a table (datahandle/downsample.py) are stored next
+# to it as "<member>@rows" and "<member>@bounds" if there is more than one.
+# Groupwise tables share one energy grid, kept once as "@G1102", and are
+# stored without the energy column as "<member>@G1102". Their levels are
+# taken on the grid alone, once for all of them ("@G1102@rows", "@G1102@bounds").
+#
+# Run "python -m datahandle.libstore" to (re)build the store from LIB_PATH.
+#
+TABLE_DIRS = ["xs", "residual"]
+COLUMNS = ["Energy", "XS", "xslow", "xsupp"]
+MAXCOLS = len(COLUMNS)
+GRID = "G1102"
+
+
+def store_path(inc_pt, nuclide):
+    return "".join([LIB_STORE_PATH, inc_pt, "/", nuclide, ".npz"])
+
+
+def store_key(lfname):
+    # LIB_PATH/<inc_pt>/<nuclide>/<lib>/tables/<xs|residual>/<file>.txt
+    if not lfname.startswith(LIB_PATH):
+        return None, None
+
+    parts = lfname[len(LIB_PATH):].split("/")
+    if len(parts) != 6 or not parts[5].endswith(".txt"):
+        return None, None
+
+    return find_store(parts[0], parts[1]), parts[5][:-4]
+
+
+def read_table_text(lfname):
+    with file_open(lfname) as f:
+        arr = pd.read_csv(
+            f,
+            sep="\s+",
+            index_col=None,
+            header=None,
+            comment="#",
+            names=COLUMNS,
+        ).to_numpy(dtype="float64")
+
+    # columns of the uncertainties only if the file has them
+    ncol = MAXCOLS
+    while ncol > 2 and np.isnan(arr[:, ncol - 1]).all():
+        ncol -= 1
+    arr = arr[:, :ncol]
+
+    arr[:, 0] *= 1e6
+    arr[:, 1:] *= 1e-3
+
+    return arr
+
+
+def npz_table(npz, key):
+    if key in npz.files:
+        return npz[key]
+
+    elif key + "@" + GRID in npz.files:
+        return np.column_stack([npz["@" + GRID], npz[key + "@" + GRID]])
+
+    return None
+
+
+def read_table_store(lfname):
+    store, key = store_key(lfname)
+
+    if store:
+        with np.load(store) as npz:
+            return npz_table(npz, key)
+
+    return None
+
+
+def read_table(lfname):
+    # returns Energy[eV], XS[b] (, xslow, xsupp) as 2D array
+    arr = read_table_store(lfname)
+
+    if arr is None:
+        arr = read_table_text(lfname)
+
+    return arr
+
+
+def is_groupwise(fname):
+    return "".join(["-", GRID, "."]) in fname
+
+
+def table_levels(fname, arr):
+    # groupwise tables are decimated on their grid, the same rows for all
+    if is_groupwise(fname):
+        return pyramid(arr[:, 0])
+
+    return pyramid(arr[:, 0], arr[:, 1])
+
+
+def read_levels_store(lfname):
+    store, key = store_key(lfname)
+
+    if store:
+        with np.load(store) as npz:
+            arr = npz_table(npz, key)
+            if arr is None:
+                return None
+            elif key + "@rows" in npz.files:
+                return arr[npz[key + "@rows"]], npz[key + "@bounds"]
+            elif key + "@" + GRID in npz.files and "@" + GRID + "@rows" in npz.files:
+                return arr[npz["@" + GRID + "@rows"]], npz["@" + GRID + "@bounds"]
+            return arr, np.array([0, len(arr)])
+
+    return None
+
+
+def read_levels(lfname):
+    # returns the levels of detail of the table stacked as one 2D array,
+    # coarsest first, and the bounds of the levels in it
+    levels = read_levels_store(lfname)
+
+    if levels is None:
+        arr = read_table(lfname)
+        rows, bounds = table_levels(lfname, arr)
+        levels = arr[rows], bounds
+
+    return levels
+
+
+def table_df(arr, names):
+    # array to DataFrame, columns not present in the file are filled by NaN
+    ncol = min(arr.shape[1], len(names))
+    df = pd.DataFrame(arr[:, :ncol], columns=names[:ncol])
+
+    return df.reindex(columns=names)
+
+
+# ------------------------------------------------------------------------------
+# Converter
+#
+def write_store(store, tables):
+    os.makedirs(os.path.dirname(store), exist_ok=True)
+
+    tmp = store + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **tables)
+    os.replace(tmp, store)
+
+
+def convert_nuclide(inc_pt, nuclide):
+    tables = {}
+    path = "".join([LIB_PATH, inc_pt, "/", nuclide, "/"])
+
+    for lib in sorted(dir_list(path)):
+        for tdir in TABLE_DIRS:
+            tpath = "".join([path, lib, "/tables/", tdir, "/"])
+            if not is_dir(tpath):
+                continue
+
+            for f in sorted(dir_list(tpath)):
+                if not f.endswith(".txt"):
+                    continue
+
+                # a null file such as g + S  33 : (g,a) gives an empty table
+                try:
+                    arr = read_table_text(tpath + f)
+                except ValueError as e:
+                    print("skip", tpath + f, e)
+                    continue
+
+                if is_groupwise(f) and len(arr):
+                    if "@" + GRID not in tables:
+                        tables["@" + GRID] = arr[:, 0]
+                        rows, bounds = table_levels(f, arr)
+                        if len(bounds) > 2:
+                            tables["@" + GRID + "@rows"] = rows.astype("int32")
+                            tables["@" + GRID + "@bounds"] = bounds
+                    if np.array_equal(tables["@" + GRID], arr[:, 0]):
+                        tables[f[:-4] + "@" + GRID] = arr[:, 1:]
+                        continue
+
+                tables[f[:-4]] = arr
+                rows, bounds = table_levels(f, arr)
+                if len(bounds) > 2:
+                    tables[f[:-4] + "@rows"] = rows.astype("int32")
+                    tables[f[:-4] + "@bounds"] = bounds
+
+    if tables:
+        write_store(store_path(inc_pt, nuclide), tables)
+        invalidate_catalog()
+
+    return len(tables)
+
+
+def convert_libs():
+    for inc_pt in PARTICLE:
+        path = "".join([LIB_PATH, inc_pt, "/"])
+        if not is_dir(path):
+            continue
+
+        for nuclide in sorted(dir_list(path)):
+            n = convert_nuclide(inc_pt, nuclide)
+            print(inc_pt, nuclide, n, "tables")
+
+
+if __name__ == "__main__":
+    convert_libs()
@@ -7,11 +7,27 @@
 #
 ####################################################################
 
-import re
 import os
+import pickle
+
+from config import EXP_PATH, RP_INDEX
+from datahandle.list import ztoelem, elemtoz, LIB_LIST_RP
+from datahandle.catalog import get_catalog
+from datahandle.index_db import count_index
+from file_utils import file_glob
+
+# ------------------------------------------------------------------------------
+# Residual products of each target
+#
+# {(projectile, nuclide): [(Z, A, isomer, [libraries], EXFOR datasets), ...]}
+# sorted by mass number, heaviest first, for every residual with a library
+# table (from the file catalog) or an EXFOR dataset (from the EXFOR index).
+# Loaded at startup from the snapshot written by "python -m datahandle.list_rp",
+# or built at the first request.
+#
+_rp_index = None
+_rp_producers = None
 
-from config import LIB_PATH
-from datahandle.list import ztoelem
 
 def residual_sep(residual):
     z = residual[0:3]
@@ -20,33 +36,154 @@ def residual_sep(residual):
     return z, a, m
 
 
-def getzz(zz):
-    return zz[0]
+def count_exfor():
+    counts = count_index("rp")
+    if counts is not None:
+        return counts
+
+    # no EXFOR index, count the dataset files
+    counts = {}
+    for f in file_glob(EXP_PATH + "*/*/exfor/residual/*/*"):
+        if f.endswith(".list"):
+            continue
+        parts = f.split("/")
+        key = (parts[-6], parts[-5], parts[-2])
+        counts[key] = counts.get(key, 0) + 1
+
+    return counts
+
+
+def build_rp_index():
+    counts = count_exfor()
+
+    products = {}
+    for key in get_catalog():
+        inc_pt, nuclide, lib, table, code, iso, _ = key
+        if table == "residual":
+            target = products.setdefault((inc_pt, nuclide), {})
+            target.setdefault(code + iso, []).append(lib)
+
+    for inc_pt, nuclide, code in counts:
+        products.setdefault((inc_pt, nuclide), {}).setdefault(code, [])
+
+    rp_index = {}
+    for target, residuals in products.items():
+        rps = []
+        for code, libs in residuals.items():
+            z, a, m = residual_sep(code)
+            rps.append((int(z), int(a), m, sorted(libs), counts.get(target + (code,), 0)))
+        rps.sort(key=lambda rp: (rp[1], rp[0], rp[2]), reverse=True)
+        rp_index[target] = rps
+
+    return rp_index
+
+
+def save_rp_index(rp_index):
+    tmp = RP_INDEX + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(rp_index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, RP_INDEX)
+
+
+def get_rp_index():
+    global _rp_index
+
+    if _rp_index is None:
+        if os.path.exists(RP_INDEX):
+            with open(RP_INDEX, "rb") as f:
+                _rp_index = pickle.load(f)
+        else:
+            _rp_index = build_rp_index()
+
+    return _rp_index
+
+
+# ------------------------------------------------------------------------------
+# Producers of each residual
+#
+# The index above inverted: {(Z, A, isomer): [(projectile, nuclide,
+# [libraries of LIB_LIST_RP], EXFOR datasets), ...]}, built from the loaded
+# index without reading the file system.
+#
+def build_rp_producers(rp_index):
+    rp_producers = {}
+    for (inc_pt, nuclide), rps in sorted(rp_index.items()):
+        for z, a, m, libs, nexfor in rps:
+            libs = [l for l in LIB_LIST_RP if l in libs]
+            if libs or nexfor:
+                rp_producers.setdefault((z, a, m), []).append(
+                    (inc_pt, nuclide, libs, nexfor)
+                )
+
+    return rp_producers
+
+
+def get_rp_producers():
+    global _rp_producers
+
+    if _rp_producers is None:
+        _rp_producers = build_rp_producers(get_rp_index())
+
+    return _rp_producers
+
+
+# ------------------------------------------------------------------------------
+# Query
+#
+def rp_name(rp):
+    # (43, 99, "m", ...) -> "Tc-099m"
+    return "".join([ztoelem(rp[0]), "-", str(rp[1]).zfill(3), rp[2]])
 
 
 def list_resid_prod(target, mass, slct_pt3):
-    lfiles = []
-    path = "".join(
-        [LIB_PATH, slct_pt3, "/", target, mass, "/tendl.2021/tables/residual/"]
-    )
-    if os.path.exists(path):
-        lfiles = os.listdir(path)
-    else:
-        lfiles = []
-
-    rps = []
-    if len(lfiles) > 0:
-        for f in lfiles:
-            rfile = os.path.basename(f)
-            rpfname = re.search(r"rp([0-9]{1,6}\w).", rfile).group(1)
-            z, a, m = residual_sep(rpfname)
-            rp_elem = ztoelem(int(z))
-            rp = rp_elem + "-" + a + m
-            rp = a, rp
-            rps.append(rp)
-        rps.sort(key=getzz, reverse=True)
-        rps = [i[1] for i in rps]
-    else:
+    rps = [rp_name(rp) for rp in get_rp_index().get((slct_pt3, target + mass), [])]
+
+    if not rps:
         rps = ["no-data"]
 
     return rps
+
+
+def resid_prod_options(target, mass, slct_pt3):
+    # options of the residual product dropdown, the value is "<elem>-<mass>"
+    options = []
+    for rp in get_rp_index().get((slct_pt3, target + mass), []):
+        libs = ", ".join(rp[3]) if rp[3] else "no library"
+        label = "".join([rp_name(rp), " (", libs, "; EXFOR: ", str(rp[4]), ")"])
+        value = "".join([ztoelem(rp[0]), "-", str(rp[1]), rp[2]])
+        options.append({"label": label, "value": value})
+
+    return options
+
+
+def find_producers(rp_elem, rp_mass):
+    # rows of the producer table of a residual, e.g. ("Tc", "099m")
+    z = elemtoz(rp_elem)
+    a = rp_mass[:3]
+    if not z or not a.isdigit():
+        return []
+
+    rows = []
+    for inc_pt, nuclide, libs, nexfor in get_rp_producers().get(
+        (int(z), int(a), rp_mass[3:]), []
+    ):
+        rows.append(
+            {
+                "projectile": inc_pt,
+                "target": nuclide,
+                "libs": ", ".join(libs),
+                "exfor": nexfor,
+            }
+        )
+
+    return rows
+
+
+if os.path.exists(RP_INDEX):
+    get_rp_producers()
+
+
+if __name__ == "__main__":
+    rp_index = build_rp_index()
+    save_rp_index(rp_index)
+    print(len(rp_index), "targets in", RP_INDEX)
@@ -0,0 +1,192 @@
+####################################################################
+#
+# This file is part of libraries-2021 dataexplorer, https://nds.iaea.org/dataexplorer/.
+# Copyright (C) 2022 International Atomic Energy Agency (IAEA)
+#
+# Contact:    nds.contact-point@iaea.org
+#
+####################################################################
+
+import os
+import glob
+import json
+import time
+import pickle
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+from config import EXFOR_INDEX_DB, MAKELIST_PATH
+from datahandle.index_db import ingest_list
+from datahandle.cache import EXFOR_CACHE
+
+# ------------------------------------------------------------------------------
+# Incremental generation of EXFORTABLES .list files
+#
+# A manifest (MAKELIST_PATH/<name>.pickle) keeps, for every dataset file,
+# (mtime, size) and the lines it contributes to the .list files,
+# [(listfile, line), ...]. A run reads only new or changed datasets, in a
+# process pool, and rewrites only the .list files whose lines changed.
+# A .list file is written to a temporary file and renamed, so readers see
+# the old or the new list, never a part of it. The rewritten lists are also
+# updated in the EXFOR index (datahandle/index_db.py) if it exists.
+#
+# MAKELIST_PATH/<name>.json summarizes the last run for the servers: the
+# number of datasets of every .list file, and the .list files and datasets
+# changed by the run (all of them after --full), which invalidate_caches
+# drops from EXFOR_CACHE (with the directory indexes of datahandle/exfor_fy.py)
+# without waiting for the stat of the entries.
+#
+_summary_seen = {}
+
+def manifest_path(name):
+    return "".join([MAKELIST_PATH, name, ".pickle"])
+
+
+def load_manifest(name):
+    try:
+        with open(manifest_path(name), "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return {}
+
+
+def save_manifest(name, manifest):
+    os.makedirs(MAKELIST_PATH, exist_ok=True)
+
+    tmp = manifest_path(name) + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(manifest, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, manifest_path(name))
+
+
+def scan_files(patterns):
+    # {path: (mtime, size)} of the dataset files, .list and temporary files excluded
+    files = {}
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            if path.endswith((".list", ".tmp")):
+                continue
+            st = os.stat(path)
+            files[path] = (st.st_mtime_ns, st.st_size)
+
+    return files
+
+
+def write_list(listfile, lines):
+    if not lines:
+        if os.path.exists(listfile):
+            os.remove(listfile)
+        return
+
+    tmp = listfile + ".tmp"
+    with open(tmp, "w") as f:
+        f.writelines(lines)
+    os.replace(tmp, listfile)
+
+
+def summary_path(name):
+    return "".join([MAKELIST_PATH, name, ".json"])
+
+
+def save_summary(name, manifest, dirty, datasets, full):
+    lists = {}
+    for entry in manifest.values():
+        for listfile, _ in entry[1]:
+            lists[listfile] = lists.get(listfile, 0) + 1
+
+    summary = {
+        "updated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "datasets": len(manifest),
+        "lists": dict(sorted(lists.items())),
+        "full": full,
+        "changed_lists": sorted(dirty),
+        "changed_datasets": [] if full else sorted(datasets),
+    }
+
+    tmp = summary_path(name) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(summary, f, indent=1)
+    os.replace(tmp, summary_path(name))
+
+
+def invalidate_caches(name):
+    # called by the servers, the summary is read again only when rewritten
+    try:
+        mtime = os.stat(summary_path(name)).st_mtime_ns
+    except OSError:
+        return
+
+    seen = _summary_seen.setdefault(name, mtime)
+    if seen == mtime:
+        return
+    _summary_seen[name] = mtime
+
+    try:
+        with open(summary_path(name)) as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return
+
+    if summary["full"]:
+        EXFOR_CACHE.clear()
+    else:
+        datasets = summary["changed_datasets"]
+        dirs = set(os.path.dirname(p) + "/" for p in datasets)
+        EXFOR_CACHE.drop(summary["changed_lists"] + datasets + sorted(dirs))
+
+
+def update_index_db(lists):
+    # lists: [(kind, listfile), ...]
+    if not lists or not os.path.exists(EXFOR_INDEX_DB):
+        return
+
+    conn = sqlite3.connect(EXFOR_INDEX_DB)
+    for kind, listfile in lists:
+        ingest_list(conn, kind, listfile)
+    conn.commit()
+    conn.close()
+
+
+def make_lists(name, patterns, entry_lines, list_kind, full=False, workers=None):
+    # entry_lines(path) -> [(listfile, line), ...], top level for the process pool
+    # list_kind(listfile) -> kind of the list in the EXFOR index
+    manifest = {} if full else load_manifest(name)
+    files = scan_files(patterns)
+
+    changed = [p for p, ident in files.items() if manifest.get(p, [None])[0] != ident]
+    removed = [p for p in manifest if p not in files]
+
+    # .list files to rewrite, with their old lines
+    dirty = set()
+    for p in changed + removed:
+        if p in manifest:
+            dirty.update(listfile for listfile, _ in manifest[p][1])
+    for p in removed:
+        del manifest[p]
+
+    if changed:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(entry_lines, changed, chunksize=64)
+            for p, lines in zip(changed, results):
+                manifest[p] = [files[p], lines]
+                dirty.update(listfile for listfile, _ in lines)
+
+    if full:
+        # also lists left by datasets no longer there or by a former tool
+        for pattern in patterns:
+            dirty.update(glob.glob(os.path.join(os.path.dirname(pattern), "*.list")))
+
+    contents = {listfile: [] for listfile in dirty}
+    for p in sorted(manifest):
+        for listfile, line in manifest[p][1]:
+            if listfile in contents:
+                contents[listfile].append(line)
+
+    for listfile, lines in sorted(contents.items()):
+        write_list(listfile, lines)
+
+    update_index_db([(list_kind(listfile), listfile) for listfile in sorted(dirty)])
+    save_manifest(name, manifest)
+    save_summary(name, manifest, dirty, changed + removed, full)
+
+    return len(changed), len(removed), len(dirty)
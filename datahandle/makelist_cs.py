@@ -0,0 +1,75 @@
+####################################################################
+#
+# This file is part of libraries-2021 dataexplorer, https://nds.iaea.org/dataexplorer/.
+# Copyright (C) 2022 International Atomic Energy Agency (IAEA)
+#
+# Contact:    nds.contact-point@iaea.org
+#
+####################################################################
+
+import os
+import argparse
+import numpy as np
+
+from config import EXP_PATH
+from datahandle.makelist import make_lists
+
+# ------------------------------------------------------------------------------
+# Cross section and residual production .list files of EXFORTABLES
+#
+# <inc>/<target>/exfor/xs/<MT>/<inc>-<target>-MT<MT>.list and
+# <inc>/<target>/exfor/residual/<ZA>/<inc>-<target>-rp<ZA>.list, read by
+# datahandle/index_cs.py. Each line is the dataset file name, the number of
+# data points, and the minimum and maximum incident energy in MeV.
+#
+# Run "python -m datahandle.makelist_cs" to update the lists, with --full to
+# rebuild all of them.
+#
+PATTERNS = [EXP_PATH + "*/*/exfor/xs/*/*", EXP_PATH + "*/*/exfor/residual/*/*"]
+
+
+def list_name(dirname):
+    # <inc>/<target>/exfor/<xs|residual>/<code>
+    parts = dirname.split("/")
+    inc, target, table, code = parts[-5], parts[-4], parts[-2], parts[-1]
+
+    return "".join(
+        [dirname, "/", inc, "-", target, "-MT" if table == "xs" else "-rp", code, ".list"]
+    )
+
+
+def list_line(fname, points, emin, emax):
+    return "%-60s %6d  %11.5E %11.5E\n" % (fname, points, emin, emax)
+
+
+def entry_lines(path):
+    dirname, fname = os.path.split(path)
+
+    try:
+        energy = np.loadtxt(path, comments="#", usecols=0, ndmin=1)
+    except (OSError, ValueError):
+        print("skip", path)
+        return []
+
+    if len(energy) == 0:
+        return []
+
+    return [
+        (list_name(dirname), list_line(fname, len(energy), energy.min(), energy.max()))
+    ]
+
+
+def list_kind(listfile):
+    return "xs" if "/exfor/xs/" in listfile else "rp"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update the xs and residual .list files")
+    parser.add_argument("--full", action="store_true", help="rebuild all lists")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    changed, removed, lists = make_lists(
+        "cs", PATTERNS, entry_lines, list_kind, args.full, args.workers
+    )
+    print(changed, "datasets read,", removed, "removed,", lists, ".list files written")
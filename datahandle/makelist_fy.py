@@ -0,0 +1,83 @@
+####################################################################
+#
+# This file is part of libraries-2021 dataexplorer, https://nds.iaea.org/dataexplorer/.
+# Copyright (C) 2022 International Atomic Energy Agency (IAEA)
+#
+# Contact:    nds.contact-point@iaea.org
+#
+####################################################################
+
+import os
+import re
+import argparse
+
+from config import EXP_PATH_FY
+from datahandle.exfor_fy import parse_exfy
+from datahandle.makelist import make_lists
+
+# ------------------------------------------------------------------------------
+# FY .list files of EXFORTABLES
+#
+# <inc>/<target>/exfor/<MT>/<inc>-<target>-MT<MT>-YA.list for Y(A) datasets
+# (all Z are 0) and <inc>-<target>-MT<MT>.list for Y(Z,A) datasets, read by
+# datahandle/index_fy.py. Each line is the dataset file name, the number of
+# data points, and E-inc and dE-inc in MeV.
+#
+# Run "python -m datahandle.makelist_fy" to update the lists, with --full to
+# rebuild all of them.
+#
+PATTERNS = [EXP_PATH_FY + "*/*/exfor/*/*"]
+LIST_PREFIX = re.compile(r"(\S+-MT4[56][490])")
+
+
+def list_line(fname, header):
+    return "%-60s %6d  %11.5E %11.5E\n" % (
+        fname,
+        header["points"] or 0,
+        header["Einc"] or 0.0,
+        header["dEinc"] or 0.0,
+    )
+
+
+def entry_lines(path):
+    dirname, fname = os.path.split(path)
+    prefix = LIST_PREFIX.match(fname)
+    if not prefix:
+        return []
+
+    try:
+        header, data = parse_exfy(path)
+    except (OSError, ValueError, TypeError, IndexError):
+        print("skip", path)
+        return []
+
+    z, a = data["Z"].sum(), data["A"].sum()
+    if header["placeholder"] is not None:
+        # datasets marked as error from C5: Z is summed from -1 after the
+        # placeholder row, as in the original list maker
+        z = data["Z"][header["placeholder"] :].sum() - 1
+
+    if z == 0 and a != 0:
+        listfile = "".join([dirname, "/", prefix.group(1), "-YA.list"])
+    elif z > 0 and a > 0:
+        listfile = "".join([dirname, "/", prefix.group(1), ".list"])
+    else:
+        return []
+
+    return [(listfile, list_line(fname, header))]
+
+
+def list_kind(listfile):
+    return "ya" if listfile.endswith("-YA.list") else "za"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update the FY .list files")
+    parser.add_argument("--full", action="store_true", help="rebuild all lists")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    changed, removed, lists = make_lists(
+        "fy", PATTERNS, entry_lines, list_kind, args.full, args.workers
+    )
+    print(changed, "datasets read,", removed, "removed,", lists, ".list files written")
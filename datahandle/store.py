@@ -0,0 +1,192 @@
+####################################################################
+#
+# This file is part of libraries-2021 dataexplorer, https://nds.iaea.org/dataexplorer/.
+# Copyright (C) 2022 International Atomic Energy Agency (IAEA)
+#
+# Contact:    nds.contact-point@iaea.org
+#
+####################################################################
+
+import time
+import uuid
+import hashlib
+import threading
+from collections import OrderedDict
+import pandas as pd
+from flask_caching.backends import FileSystemCache
+
+from config import (
+    FRAME_STORE_SERVER,
+    FRAME_STORE_DIR,
+    FRAME_STORE_TTL,
+    FRAME_STORE_ITEMS,
+    FRAME_STORE_FILES,
+)
+from datahandle.codec import encode_columns, decode_columns
+from datahandle.cache import freeze
+from datahandle.downsample import plot_level
+
+# ------------------------------------------------------------------------------
+# Server side frame store
+#
+# DataFrames passed between callbacks stay on the server, only an opaque key
+# goes through the browser. Frames are kept as live, read-only objects in an
+# LRU of the worker process (FRAME_STORE_ITEMS frames), and written to
+# FRAME_STORE_DIR only when they are pushed out of it, so that the same
+# worker can find them later. Both expire after FRAME_STORE_TTL seconds.
+# A frame which is not found (expired, or stored by another worker) is read
+# again by the function it was built with (frame_source), under the same
+# key, so the keys held by the browser stay valid.
+#
+_memory = OrderedDict()  # key: [df, expiry, written to disk when evicted]
+_lock = threading.Lock()
+_disk = FileSystemCache(
+    FRAME_STORE_DIR, threshold=FRAME_STORE_FILES, default_timeout=FRAME_STORE_TTL
+)
+_sources = {}
+
+
+def frame_source(name):
+    # registers func(*args) -> DataFrame, args being JSON values
+    def register(func):
+        _sources[name] = func
+        return func
+
+    return register
+
+
+def put_frame(df, key=None, spill=True):
+    key = key or uuid.uuid4().hex
+    now = time.monotonic()
+
+    with _lock:
+        _memory[key] = [freeze(df), now + FRAME_STORE_TTL, spill]
+        _memory.move_to_end(key)
+
+        evicted = [(k, e) for k, e in _memory.items() if e[1] <= now]
+        for k, _ in evicted:
+            del _memory[k]
+        while len(_memory) > FRAME_STORE_ITEMS:
+            evicted.append(_memory.popitem(last=False))
+
+    for k, (old, expiry, spill) in evicted:
+        if spill and expiry > now:
+            try:
+                _disk.set(k, old, timeout=int(expiry - now) + 1)
+            except OSError:  # no writable local disk, memory only
+                pass
+
+    return key
+
+
+def memory_frame(key):
+    with _lock:
+        entry = _memory.get(key)
+        if entry and entry[1] > time.monotonic():
+            _memory.move_to_end(key)
+            return entry[0]
+
+    return None
+
+
+def get_frame(key):
+    df = memory_frame(key)
+
+    if df is None:
+        df = _disk.get(key)
+        if df is None:
+            raise KeyError("".join(["frame ", key, " has expired"]))
+        _disk.delete(key)
+        put_frame(df, key)
+
+    return df
+
+
+# ------------------------------------------------------------------------------
+# Payloads of dcc.Store
+#
+# {"key": ..., "source": [name, args]} for a frame in the server side store,
+# {"cols": ...} for a frame sent to the browser (FRAME_STORE_SERVER = False),
+# see datahandle/codec.py. Of the levels of detail of a library table only
+# the one plotted for the whole curve goes to the browser, so zoomed curves
+# are refined from the other levels with the server side store only.
+#
+def encode_frame(df, source=None):
+    # source: [name, args] of the frame_source that rebuilds df when expired
+    if FRAME_STORE_SERVER:
+        return {"key": put_frame(df), "source": source}
+
+    return {"cols": encode_columns(plot_level(df))}
+
+
+def decode_frame(payload):
+    if "key" not in payload:
+        return decode_columns(payload["cols"])
+
+    try:
+        return get_frame(payload["key"])
+    except KeyError:
+        if not payload.get("source"):
+            raise
+
+    name, args = payload["source"]
+    df = _sources[name](*args)
+    put_frame(df, payload["key"])
+
+    return df
+
+
+# ------------------------------------------------------------------------------
+# Experimental data selection
+#
+# stored_exps = {"input": userinput, "entries": {key: {"data": payload, ...}}}
+# with one payload per selected dataset. The selection is resolved by the
+# clientside callbacks in assets/clientside.js, which drop deselected
+# datasets and request only the new ones from the server.
+#
+def split_entries(exfor_df, keys, source):
+    # {key: {"data": payload}} for each requested entry, None if not found,
+    # the frame of an entry is rebuilt by source = [name, args + [entry]]
+    if exfor_df.empty:
+        groups = {}
+    else:
+        groups = dict(tuple(exfor_df.groupby("entry", sort=False)))
+
+    return {
+        key: {
+            "data": encode_frame(groups[key], [source[0], source[1] + [key]])
+            if key in groups
+            else None
+        }
+        for key in keys
+    }
+
+
+def concat_frames(payloads):
+    dfs = [decode_frame(p) for p in payloads]
+    dfs = [df for df in dfs if not df.empty]
+
+    if dfs:
+        return pd.concat(dfs, ignore_index=True)
+
+    return pd.DataFrame()
+
+
+def stored_frame(stored):
+    payloads = [v["data"] for v in stored["entries"].values() if v["data"]]
+
+    if not payloads or not all("key" in p for p in payloads):
+        return concat_frames(payloads)
+
+    # the figure and the tab callbacks of a page read the same selection,
+    # the frame is built once and shared read-only through the memory store,
+    # never written to disk as it is rebuilt from its parts
+    key = "".join(
+        ["concat-", hashlib.sha1("-".join(p["key"] for p in payloads).encode()).hexdigest()]
+    )
+    df = memory_frame(key)
+    if df is None:
+        df = concat_frames(payloads)
+        put_frame(df, key, spill=False)
+
+    return df
@@ -224,3 +224,26 @@ def create_tabs_fy(pageparam):
     )
     # ])
     return tabs
+
+
+def create_producers_table(pageparam):
+    # targets and projectiles producing the selected residual, see datahandle/list_rp.py
+    return html.Div(
+        [
+            html.H5(id="".join(["producers_title_", pageparam])),
+            dash_table.DataTable(
+                id="".join(["producers_table_", pageparam]),
+                columns=[
+                    {"name": "Projectile", "id": "projectile"},
+                    {"name": "Target", "id": "target"},
+                    {"name": "Libraries", "id": "libs"},
+                    {"name": "EXFOR datasets", "id": "exfor", "type": "numeric"},
+                ],
+                filter_action="native",
+                sort_action="native",
+                sort_mode="single",
+                page_action="none",
+                style_table={"height": "300px", "overflowY": "auto"},
+            ),
+        ]
+    )
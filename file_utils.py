@@ -1,33 +1,210 @@
-# import os
-# import glob
-# from config import CLOUD
-# from dash_app import FS
+####################################################################
 #
+# This file is part of libraries-2021 dataexplorer, https://nds.iaea.org/dataexplorer/.
+# Copyright (C) 2022 International Atomic Energy Agency (IAEA)
 #
-# def path_exists(path):
-#     """Checks if a path exists locally or on cloud"""
-#     if CLOUD:
-#         return FS.exists(path)  # TODO
+# Contact:    nds.contact-point@iaea.org
 #
-#     return os.path.exists(path)
+####################################################################
+
+import io
+import os
+import glob
+import mmap
+import pickle
+import fnmatch
+import tarfile
+import threading
+
+from config import TAR_ARCHIVES, TAR_MMAP
+
+# ------------------------------------------------------------------------------
+# Access to the data files, untarred or in the tar archives
 #
+# With TAR_ARCHIVES ({archive: path prefix of its members}), EXFORTABLES and
+# ENDFTABLES are read from exfortables.tar and endftables.tar without
+# untarring them. The archive is walked once to index its members, member
+# name: (offset of the data, size, mtime), and the index is kept next to
+# the archive (<archive>.index) until the archive changes. A file is then
+# read by one seek (or a slice of the memory mapped archive if TAR_MMAP).
+# Paths not in an archive, and all paths without TAR_ARCHIVES, are the
+# files on disk.
 #
-# def file_open(filename):
-#     if CLOUD:
-#         return FS.open(filename)
+_files = {}  # path: (archive, offset, size, mtime)
+_dirs = {}  # directory path with "/": set of entry names
+_archives = {}  # archive: (fd, mmap or None)
+_lock = threading.Lock()
+
+
+def index_path(archive):
+    return archive + ".index"
+
+
+def build_tar_index(archive):
+    members = {}
+    with tarfile.open(archive, "r:") as tar:
+        m = tar.next()
+        while m is not None:
+            if m.isfile():
+                name = m.name[2:] if m.name.startswith("./") else m.name
+                members[name] = (m.offset_data, m.size, m.mtime)
+            # do not keep millions of TarInfo in the TarFile
+            tar.members = []
+            m = tar.next()
+
+    return members
+
+
+def load_tar_index(archive):
+    st = os.stat(archive)
+    ident = (st.st_mtime_ns, st.st_size)
+
+    try:
+        with open(index_path(archive), "rb") as f:
+            saved = pickle.load(f)
+        if saved["ident"] == ident:
+            return saved["members"]
+    except (OSError, EOFError, KeyError, pickle.UnpicklingError):
+        pass
+
+    members = build_tar_index(archive)
+
+    try:
+        tmp = index_path(archive) + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(
+                {"ident": ident, "members": members},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp, index_path(archive))
+    except OSError:
+        # read-only data directory, index again in the next process
+        pass
+
+    return members
+
+
+def load_archives():
+    for archive, prefix in TAR_ARCHIVES.items():
+        for name, (offset, size, mtime) in load_tar_index(archive).items():
+            path = prefix + name
+            _files[path] = (archive, offset, size, mtime)
+
+            # register the file and its parents up to the prefix in their directories
+            while len(path) > len(prefix):
+                parent, _, entry = path.rpartition("/")
+                entries = _dirs.setdefault(parent + "/", set())
+                if entry in entries:
+                    break
+                entries.add(entry)
+                path = parent
+
+
+def archive_of(archive):
+    with _lock:
+        if archive not in _archives:
+            fd = os.open(archive, os.O_RDONLY)
+            mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ) if TAR_MMAP else None
+            _archives[archive] = (fd, mm)
+
+        return _archives[archive]
+
+
+# ------------------------------------------------------------------------------
+# File system functions
 #
-#     return open(filename)
-#
-#
-# def file_glob(file_pattern):
-#     if CLOUD:
-#         return ["gs://{0}".format(fn) for fn in FS.glob(file_pattern)]
-#
-#     return glob.glob(file_pattern)
-#
-#
-# def dir_list(dirname):
-#     if CLOUD:
-#         return ["gs://{0}".format(fn) for fn in FS.ls(dirname)]
-#
-#     return os.listdir(dirname)
+def path_exists(path):
+    if path in _files or path.rstrip("/") + "/" in _dirs:
+        return True
+
+    return os.path.exists(path)
+
+
+def is_dir(path):
+    if path.rstrip("/") + "/" in _dirs:
+        return True
+
+    return os.path.isdir(path)
+
+
+def dir_list(dirname):
+    entries = _dirs.get(dirname.rstrip("/") + "/")
+    if entries is not None:
+        return sorted(entries)
+
+    return os.listdir(dirname)
+
+
+def file_glob(file_pattern):
+    # patterns with wildcards in the file and directory names, e.g. EXP_PATH + "*/*/exfor/xs/*/*"
+    matches = glob.glob(file_pattern)
+
+    if _dirs:
+        parts = file_pattern.split("/")
+        root = parts[0] + "/"
+        i = 1
+        while i < len(parts) - 1 and not glob.has_magic(parts[i]):
+            root += parts[i] + "/"
+            i += 1
+
+        paths = [root] if root in _dirs else []
+        for part in parts[i:]:
+            paths = [
+                "".join([p, e, "/"])
+                for p in paths
+                for e in sorted(_dirs.get(p, []))
+                if fnmatch.fnmatchcase(e, part)
+            ]
+        found = set(matches)
+        matches += [p[:-1] for p in paths if p[:-1] in _files and p[:-1] not in found]
+
+    return matches
+
+
+def file_stat(path):
+    # (mtime, size) identifying the content of the file
+    if path in _files:
+        _, _, size, mtime = _files[path]
+        return int(mtime * 1e9), size
+
+    entries = _dirs.get(path.rstrip("/") + "/")
+    if entries is not None:
+        # directories of an archive only change with the archive
+        return 0, len(entries)
+
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def file_bytes(path):
+    if path not in _files:
+        with open(path, "rb") as f:
+            return f.read()
+
+    archive, offset, size, _ = _files[path]
+    fd, mm = archive_of(archive)
+    if mm is not None:
+        return mm[offset : offset + size]
+
+    return os.pread(fd, size, offset)
+
+
+def file_open(filename, mode="r"):
+    if filename not in _files:
+        return open(filename, mode)
+
+    data = io.BytesIO(file_bytes(filename))
+    if "b" in mode:
+        return data
+
+    return io.TextIOWrapper(data)
+
+
+if TAR_ARCHIVES:
+    load_archives()
+
+
+if __name__ == "__main__":
+    for archive in TAR_ARCHIVES:
+        print(archive, len(load_tar_index(archive)), "members in", index_path(archive))
@@ -12,6 +12,11 @@ import dash_bootstrap_components as dbc
 from dash import dcc
 from dash import html
 from dash.dependencies import Input, Output
+from flask import Response, abort
+
+from config import DATA_ROOT_FOLDER, TAR_ARCHIVES
+from file_utils import path_exists, file_bytes
+from datahandle.catalog import get_catalog
 
 # Connect to main app.py file
 from app import app
@@ -172,6 +177,21 @@ def open_toast(n):
         return True
     return False
 
+# the download links of the data files (datahandle/genlinks.py), served by the
+# web server from the untarred files, are served from the archives here
+if TAR_ARCHIVES:
+
+    @app.server.route("/libraries/<path:name>")
+    def send_datafile(name):
+        path = "".join([DATA_ROOT_FOLDER, "libraries/", name])
+        if ".." in name or not path_exists(path):
+            abort(404)
+
+        return Response(file_bytes(path), mimetype="text/plain")
+
+
+# the catalog of the libraries is loaded (or walked) before the first request
+get_catalog()
 
 
 if __name__ == "__main__":